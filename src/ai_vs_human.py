@@ -4,8 +4,16 @@
 
 import math
 import random
-import time
-from game_core import ROWS, COLS, WINDOW_LENGTH, EMPTY, PLAYER1_PIECE, PLAYER2_PIECE
+import threading
+from game_core import ConnectFourGame, ROWS, COLS, PLAYER1_PIECE, PLAYER2_PIECE
+
+# Numba (opsiyonel): minimax'i makine koduna derler, yoksa saf Python kullanılır
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # --- TUNED HEURISTICS ---
 SCORE_WIN = 10000000000
@@ -26,64 +34,232 @@ OPENING_BOOK = {
     (0,): 3, (1,): 3, (2,): 3, (4,): 3, (5,): 3, (6,): 3,
 }
 
+# --- COMPILED SEARCH (Numba) ---
+# Same search and heuristics as AIEngine.minimax/score_position, but on plain
+# integer bitboards with make/unmake instead of game clones.
+
+def _build_window_masks():
+    """Bitmask of every 4-cell window (horizontal, vertical, both diagonals)"""
+    def bit(c, r):
+        return 1 << (c * (ROWS + 1) + r)
+    masks = []
+    for r in range(ROWS):
+        for c in range(COLS - 3):
+            masks.append(sum(bit(c + i, r) for i in range(4)))
+    for c in range(COLS):
+        for r in range(ROWS - 3):
+            masks.append(sum(bit(c, r + i) for i in range(4)))
+    for r in range(ROWS - 3):
+        for c in range(COLS - 3):
+            masks.append(sum(bit(c + i, r + i) for i in range(4)))
+    for r in range(3, ROWS):
+        for c in range(COLS - 3):
+            masks.append(sum(bit(c + i, r - i) for i in range(4)))
+    return masks
+
+WINDOW_MASKS = _build_window_masks()
+CENTER_MASK = sum(1 << ((COLS // 2) * (ROWS + 1) + r) for r in range(ROWS))
+MOVE_ORDER = sorted(range(COLS), key=lambda x: abs(x - COLS // 2))
+SCORE_TERMINAL = 100000000000
+
+# --- TRANSPOSITION TABLE ---
+# Entry = (depth, flag, value, best_col). The two bitboards identify a position
+# exactly, so they are packed into one int key instead of a Zobrist hash.
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 1 << 20
+TT_SLOTS = 1048573  # Compiled search: fixed table, prime size so key % size spreads columns
+
+if NUMBA_AVAILABLE:
+    _WINDOW_MASKS = np.array(WINDOW_MASKS, dtype=np.int64)
+    _MOVE_ORDER = np.array(MOVE_ORDER, dtype=np.int64)
+    _NEG_INF = -(1 << 62)
+    _POS_INF = 1 << 62
+    _BOTTOM_MASK = sum(1 << (c * (ROWS + 1)) for c in range(COLS))
+    _WARM_UP_TABLE = (np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64))
+
+    @njit(cache=True, nogil=True)
+    def _popcount(x):
+        n = 0
+        while x:
+            x &= x - 1
+            n += 1
+        return n
+
+    @njit(cache=True, nogil=True)
+    def _has_won(bb):
+        m = bb & (bb >> 1)
+        if m & (m >> 2):
+            return True
+        m = bb & (bb >> 7)
+        if m & (m >> 14):
+            return True
+        m = bb & (bb >> 8)
+        if m & (m >> 16):
+            return True
+        m = bb & (bb >> 6)
+        return (m & (m >> 12)) != 0
+
+    @njit(cache=True, nogil=True)
+    def _score_position(own, opp, windows):
+        score = _popcount(own & CENTER_MASK) * SCORE_CENTER
+        for i in range(windows.shape[0]):
+            w = windows[i]
+            n_own = _popcount(own & w)
+            n_opp = _popcount(opp & w)
+            n_empty = 4 - n_own - n_opp
+            if n_own == 4:
+                score += SCORE_WIN
+            elif n_own == 3 and n_empty == 1:
+                score += SCORE_3_OPEN
+            elif n_own == 2 and n_empty == 2:
+                score += SCORE_2_OPEN
+            if n_opp == 3 and n_empty == 1:
+                score += SCORE_BLOCK
+        return score
+
+    @njit(cache=True, nogil=True)
+    def _minimax(own, opp, heights, depth, alpha, beta, maximizing, own_moves_at_max, windows, order,
+                 tt_keys, tt_vals):
+        """Returns (best_col, value); own = AI's bitboard. best_col is -1 at leaves."""
+        own_won = _has_won(own)
+        opp_won = _has_won(opp)
+        has_moves = False
+        for c in range(COLS):
+            if heights[c] <= c * (ROWS + 1) + ROWS - 1:
+                has_moves = True
+                break
+        if own_won or opp_won or not has_moves:
+            if own_won:
+                return -1, SCORE_TERMINAL
+            if opp_won:
+                return -1, -SCORE_TERMINAL
+            return -1, 0
+        if depth == 0:
+            return -1, _score_position(own, opp, windows)
+
+        # Transposition table probe (always-replace, one slot per index).
+        # Entry = value << 12 | depth << 5 | flag << 3 | (best_col + 1)
+        key = own + (own | opp) + _BOTTOM_MASK
+        slot = key % tt_keys.shape[0]
+        tt_col = -1
+        if tt_keys[slot] == key:
+            entry = tt_vals[slot]
+            tt_col = (entry & 7) - 1
+            if (entry >> 5) & 63 >= depth:
+                tt_flag = (entry >> 3) & 3
+                tt_value = entry >> 12
+                if tt_flag == TT_EXACT:
+                    return tt_col, tt_value
+                if tt_flag == TT_LOWER:
+                    alpha = max(alpha, tt_value)
+                else:
+                    beta = min(beta, tt_value)
+                if alpha >= beta:
+                    return tt_col, tt_value
+        alpha_orig = alpha
+        beta_orig = beta
+
+        own_moves = own_moves_at_max if maximizing else not own_moves_at_max
+        best_col = -1
+        value = _NEG_INF if maximizing else _POS_INF
+        # i == -1 is the stored best move, tried before the center-first order
+        for i in range(-1, order.shape[0]):
+            if i < 0:
+                if tt_col < 0:
+                    continue
+                col = tt_col
+            else:
+                col = order[i]
+                if col == tt_col:
+                    continue
+            h = heights[col]
+            if h > col * (ROWS + 1) + ROWS - 1:
+                continue
+            move_bit = 1 << h
+            heights[col] = h + 1
+            if own_moves:
+                new_score = _minimax(own | move_bit, opp, heights, depth - 1, alpha, beta,
+                                     not maximizing, own_moves_at_max, windows, order,
+                                     tt_keys, tt_vals)[1]
+            else:
+                new_score = _minimax(own, opp | move_bit, heights, depth - 1, alpha, beta,
+                                     not maximizing, own_moves_at_max, windows, order,
+                                     tt_keys, tt_vals)[1]
+            heights[col] = h
+            if maximizing:
+                if new_score > value:
+                    value = new_score
+                    best_col = col
+                alpha = max(alpha, value)
+            else:
+                if new_score < value:
+                    value = new_score
+                    best_col = col
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if value <= alpha_orig:
+            flag = TT_UPPER
+        elif value >= beta_orig:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        tt_keys[slot] = key
+        tt_vals[slot] = (value << 12) | (depth << 5) | (flag << 3) | (best_col + 1)
+        return best_col, value
+
+    def new_tt_table():
+        """Zeroed (keys, entries) arrays for the compiled search's transposition table"""
+        return np.zeros(TT_SLOTS, dtype=np.int64), np.zeros(TT_SLOTS, dtype=np.int64)
+
+    def find_best_move_core(own_bb, opp_bb, heights, depth, own_to_move=True, tt_table=None):
+        """Compiled minimax entry point; returns (col or None, score)"""
+        tt_keys, tt_vals = tt_table if tt_table is not None else new_tt_table()
+        col, score = _minimax(own_bb, opp_bb, np.array(heights, dtype=np.int64), depth,
+                              _NEG_INF, _POS_INF, True, own_to_move, _WINDOW_MASKS, _MOVE_ORDER,
+                              tt_keys, tt_vals)
+        return (None if col < 0 else int(col)), int(score)
+
+def warm_up():
+    """Load (or compile) the Numba kernel ahead of the first AI move; no-op without Numba"""
+    if NUMBA_AVAILABLE:
+        find_best_move_core(0, 0, [c * (ROWS + 1) for c in range(COLS)], 1, True, _WARM_UP_TABLE)
+
 class AIEngine:
     def __init__(self, player_id, depth=MAX_DEPTH_DEFAULT):
         self.player_id = player_id
         self.opp_player_id = PLAYER1_PIECE if player_id == PLAYER2_PIECE else PLAYER2_PIECE
         self.depth = depth
+        self.tt = {}  # Kept across moves of the same game
+        self.tt_table = None  # Compiled search's table, allocated on first use
+        self._stop = threading.Event()
 
-    def evaluate_window(self, window, piece):
-        score = 0
-        opp_piece = self.opp_player_id
-
-        if window.count(piece) == 4:
-            score += SCORE_WIN
-        elif window.count(piece) == 3 and window.count(EMPTY) == 1:
-            score += SCORE_3_OPEN
-        elif window.count(piece) == 2 and window.count(EMPTY) == 2:
-            score += SCORE_2_OPEN
-
-        if window.count(opp_piece) == 3 and window.count(EMPTY) == 1:
-            score += SCORE_BLOCK
-
-        return score
+    def stop(self):
+        """Ask a running find_best_move to return after its current iteration"""
+        self._stop.set()
 
     def score_position(self, game, piece):
-        score = 0
-        
-        # 1. Center Control
-        center_idx = COLS // 2
-        center_col = [(game.bitboards[piece] >> (center_idx * (ROWS+1) + r)) & 1 for r in range(ROWS)]
-        score += sum(center_col) * SCORE_CENTER
-
-        # 2. Board Reconstruction
-        board = [[EMPTY]*COLS for _ in range(ROWS)]
-        for c in range(COLS):
-            for r in range(ROWS):
-                idx = c * (ROWS + 1) + r
-                if (game.bitboards[PLAYER1_PIECE] >> idx) & 1: board[r][c] = PLAYER1_PIECE
-                elif (game.bitboards[PLAYER2_PIECE] >> idx) & 1: board[r][c] = PLAYER2_PIECE
-
-        # 3. Window Scanning
-        # Horizontal
-        for r in range(ROWS):
-            for c in range(COLS - 3):
-                window = board[r][c:c+4]
-                score += self.evaluate_window(window, piece)
-        # Vertical
-        for c in range(COLS):
-            for r in range(ROWS - 3):
-                window = [board[r+i][c] for i in range(4)]
-                score += self.evaluate_window(window, piece)
-        # Diagonals
-        for r in range(ROWS - 3):
-            for c in range(COLS - 3):
-                window = [board[r+i][c+i] for i in range(4)]
-                score += self.evaluate_window(window, piece)
-        for r in range(3, ROWS):
-            for c in range(COLS - 3):
-                window = [board[r-i][c+i] for i in range(4)]
-                score += self.evaluate_window(window, piece)
+        # Bitboard scan over the precomputed 4-cell window masks. A window
+        # holding pieces of both sides scores nothing, so it is skipped early.
+        own = game.bitboards[piece]
+        opp = game.bitboards[PLAYER1_PIECE if piece == PLAYER2_PIECE else PLAYER2_PIECE]
+        score = bin(own & CENTER_MASK).count('1') * SCORE_CENTER
+        for w in WINDOW_MASKS:
+            own_w = own & w
+            opp_w = opp & w
+            if own_w:
+                if opp_w:
+                    continue
+                n = bin(own_w).count('1')
+                if n == 4:
+                    score += SCORE_WIN
+                elif n == 3:
+                    score += SCORE_3_OPEN
+                elif n == 2:
+                    score += SCORE_2_OPEN
+            elif opp_w and bin(opp_w).count('1') == 3:
+                score += SCORE_BLOCK
         return score
 
     def is_terminal_node(self, game):
@@ -96,6 +272,23 @@ class AIEngine:
         return False
 
     def minimax(self, game, depth, alpha, beta, maximizingPlayer):
+        # Transposition table probe
+        key = (game.bitboards[PLAYER1_PIECE] << 64) | game.bitboards[PLAYER2_PIECE]
+        entry = self.tt.get(key)
+        tt_col = None
+        if entry is not None:
+            tt_depth, tt_flag, tt_value, tt_col = entry
+            if tt_depth >= depth:
+                if tt_flag == TT_EXACT:
+                    return tt_col, tt_value
+                if tt_flag == TT_LOWER:
+                    alpha = max(alpha, tt_value)
+                else:
+                    beta = min(beta, tt_value)
+                if alpha >= beta:
+                    return tt_col, tt_value
+        alpha_orig, beta_orig = alpha, beta
+
         valid_locations = game.get_valid_locations()
         is_terminal = self.is_terminal_node(game)
         
@@ -104,13 +297,20 @@ class AIEngine:
                 if game.check_win(self.player_id): return (None, 100000000000)
                 elif game.check_win(self.opp_player_id): return (None, -100000000000)
                 else: return (None, 0) # Game is over, no more valid moves
-            else: return (None, self.score_position(game, self.player_id))
+            else:
+                value = self.score_position(game, self.player_id)
+                self.tt[key] = (0, TT_EXACT, value, None)
+                return (None, value)
 
         if not valid_locations:
              return (None, 0)
 
         # Heuristic sort for pruning 
         valid_locations.sort(key=lambda x: abs(x - COLS//2))
+        # Best move from an earlier search (or iteration) first
+        if tt_col is not None:
+            valid_locations.remove(tt_col)
+            valid_locations.insert(0, tt_col)
 
         if maximizingPlayer:
             value = -math.inf
@@ -126,6 +326,7 @@ class AIEngine:
                     best_col = col
                 alpha = max(alpha, value)
                 if alpha >= beta: break
+            self._tt_store(key, depth, value, best_col, alpha_orig, beta_orig)
             return best_col, value
         else:
             value = math.inf
@@ -141,8 +342,18 @@ class AIEngine:
                     best_col = col
                 beta = min(beta, value)
                 if alpha >= beta: break
+            self._tt_store(key, depth, value, best_col, alpha_orig, beta_orig)
             return best_col, value
 
+    def _tt_store(self, key, depth, value, best_col, alpha, beta):
+        if value <= alpha:
+            flag = TT_UPPER
+        elif value >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.tt[key] = (depth, flag, value, best_col)
+
     def find_best_move(self, game):
         # 0. Early Exit for Full Board
         valid_moves = game.get_valid_locations()
@@ -155,10 +366,26 @@ class AIEngine:
              move = OPENING_BOOK[history]
              if game.is_valid_location(move): return move
         
-        # 2. Minimax
+        # 2. Iterative deepening minimax (compiled kernel when Numba is installed).
+        # Each iteration tries the previous best move first; stop() ends the
+        # search between iterations with the best move found so far.
+        if len(self.tt) > TT_MAX_ENTRIES:
+            self.tt.clear()
+        if NUMBA_AVAILABLE and self.tt_table is None:
+            self.tt_table = new_tt_table()
         game_copy = game.clone()
+        col = None
         try:
-            col, score = self.minimax(game_copy, self.depth, -math.inf, math.inf, True)
+            for depth in range(1, self.depth + 1):
+                if NUMBA_AVAILABLE:
+                    col, score = find_best_move_core(
+                        game_copy.bitboards[self.player_id], game_copy.bitboards[self.opp_player_id],
+                        game_copy.heights, depth, game_copy.current_player == self.player_id,
+                        self.tt_table)
+                else:
+                    col, score = self.minimax(game_copy, depth, -math.inf, math.inf, True)
+                if self._stop.is_set() or abs(score) >= SCORE_TERMINAL:
+                    break
         except Exception as e:
             print(f"[AI ERROR] Minimax crashed: {e}")
             col = None
@@ -167,4 +394,18 @@ class AIEngine:
         if col is None:
             return random.choice(valid_moves)
         
-        return col
\ No newline at end of file
+        return col
+
+_worker_engine = (None, None)  # ((session, player_id, depth), AIEngine) of the current game
+
+def search_best_move(game_state, player_id, depth, session=None):
+    """Process-pool entry point: rebuild the game from its to_dict() snapshot and search"""
+    global _worker_engine
+    game = ConnectFourGame()
+    game.from_dict(game_state)
+    # Each worker keeps the engine of the current game so its transposition table
+    # carries over between moves; a new session (game) replaces it and frees the table
+    key = (session, player_id, depth)
+    if _worker_engine[0] != key:
+        _worker_engine = (key, AIEngine(player_id, depth=depth))
+    return _worker_engine[1].find_best_move(game)
@@ -29,7 +29,8 @@ class ConnectFourGame:
         """Resets the game state."""
         self.bitboards = {PLAYER1_PIECE: 0, PLAYER2_PIECE: 0}
         
-        self.heights = [c * (ROWS + 1) for c in range(COLS)]
+        # Next free bit index per column; max value 48 so one byte each
+        self.heights = bytearray(c * (ROWS + 1) for c in range(COLS))
         
         self.move_history = []
         self.move_count = 0
@@ -48,11 +49,11 @@ class ConnectFourGame:
             return False
 
         # 1. Update Bitboard
-        move_bit = 1 << self.heights[col]
-        self.bitboards[self.current_player] ^= move_bit #XOR for setting bit
+        h = self.heights[col]
+        self.bitboards[self.current_player] ^= 1 << h #XOR for setting bit
         
         # 2. Update State
-        self.heights[col] += 1
+        self.heights[col] = h + 1
         self.move_history.append(col)
         self.move_count += 1
 
@@ -87,21 +88,34 @@ class ConnectFourGame:
     def check_win(self, player):
         """
         win conditions using bitboard operations.
+        Unrolled per direction; shift amounts are literals for ROWS = 6
+        (vertical 1, horizontal ROWS+1 = 7, diagonal / ROWS+2 = 8, diagonal \\ ROWS = 6).
         """
         bb = self.bitboards[player]
-        
-        # Directions: Vertical, Horizontal, Diagonal /, Diagonal \
-        directions = [1, ROWS + 1, ROWS + 2, ROWS] 
-        
-        for d in directions:
-            m = bb & (bb >> d)
-            if m & (m >> (2 * d)):
-                temp_mask = (bb & (bb >> d) & (bb >> (2 * d)) & (bb >> (3 * d)))
-                if temp_mask:
-                    self.winning_mask = (temp_mask | (temp_mask << d) | (temp_mask << (2 * d)) | (temp_mask << (3 * d)))
-                    return True
+
+        # Vertical
+        m = bb & (bb >> 1)
+        if m & (m >> 2):
+            return self._set_winning_mask(m & (m >> 2), 1)
+        # Horizontal
+        m = bb & (bb >> 7)
+        if m & (m >> 14):
+            return self._set_winning_mask(m & (m >> 14), 7)
+        # Diagonal /
+        m = bb & (bb >> 8)
+        if m & (m >> 16):
+            return self._set_winning_mask(m & (m >> 16), 8)
+        # Diagonal \
+        m = bb & (bb >> 6)
+        if m & (m >> 12):
+            return self._set_winning_mask(m & (m >> 12), 6)
         return False
 
+    def _set_winning_mask(self, start_mask, d):
+        """Expands the start bits of a 4-in-a-row along direction d."""
+        self.winning_mask = start_mask | (start_mask << d) | (start_mask << (2 * d)) | (start_mask << (3 * d))
+        return True
+
     def clone(self):
         """Creates a deep copy of the game state for AI simulations."""
         new_game = ConnectFourGame(self.current_player)
@@ -116,10 +130,14 @@ class ConnectFourGame:
         return new_game
 
     def to_dict(self):
-        """Serializes state for network transmission."""
+        """Serializes state for network transmission.
+
+        Bitboards go out as a [p1, p2] list rather than an int-keyed dict so
+        JSON encoders need no key conversion on either side.
+        """
         return {
-            'bitboards': self.bitboards,
-            'heights': self.heights,
+            'bb': [self.bitboards[PLAYER1_PIECE], self.bitboards[PLAYER2_PIECE]],
+            'h': list(self.heights),
             'history': self.move_history,
             'current': self.current_player,
             'state': self.game_state,
@@ -130,8 +148,13 @@ class ConnectFourGame:
 
     def from_dict(self, data):
         """Restores state from network data."""
-        self.bitboards = {int(k): v for k, v in data['bitboards'].items()}
-        self.heights = data['heights']
+        if 'bb' in data:
+            self.bitboards = {PLAYER1_PIECE: data['bb'][0], PLAYER2_PIECE: data['bb'][1]}
+            self.heights = bytearray(data['h'])
+        else:
+            # Legacy payload from older servers: {"1": bb, "2": bb}
+            self.bitboards = {int(k): v for k, v in data['bitboards'].items()}
+            self.heights = bytearray(data['heights'])
         self.move_history = data['history']
         self.current_player = data['current']
         self.game_state = data['state']
@@ -10,13 +10,52 @@ os.environ['SDL_AUDIODRIVER'] = 'dummy'
 
 import pygame
 import sys
+import asyncio
+import logging
+import logging.handlers
+import random
+import enum
+import socket
 import threading
 import time
+import queue
+import concurrent.futures
+import multiprocessing
+from collections import deque
 import requests
-import socketio
+
+# orjson (optional): faster encode/decode of every Socket.IO packet
+try:
+    import orjson
+
+    class _OrjsonCodec:
+        """json-module shim so python-socketio can use orjson."""
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+    SOCKETIO_JSON = _OrjsonCodec
+except ImportError:
+    SOCKETIO_JSON = None
+
+# uvloop (optional, Linux/macOS): libuv-based event loop for the network client
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# msgpack (optional): decodes binary move_made frames (server started with BINARY_BOARD=1)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 from game_core import ConnectFourGame, ROWS, COLS, PLAYER1_PIECE, PLAYER2_PIECE
-from ai_vs_human import AIEngine
+from ai_vs_human import AIEngine, NUMBA_AVAILABLE, search_best_move, warm_up
 
 # =============================================================================
 # DEBUG FLAG - Set to False to disable console logs
@@ -27,6 +66,42 @@ def log(msg):
     if DEBUG:
         print(f"[GUI] {msg}")
 
+# Network events go through a QueueHandler so the asyncio receive loop never
+# waits on stdout; a listener thread does the formatting and the write.
+NET_LOG_RATE = 20  # Max network log lines per second; the rest are dropped
+
+class _RateLimitFilter(logging.Filter):
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self.window = 0
+        self.count = 0
+
+    def filter(self, record):
+        second = int(record.created)
+        if second != self.window:
+            self.window, self.count = second, 0
+        self.count += 1
+        return self.count <= self.rate
+
+net_log = logging.getLogger("net")
+net_log.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+net_log.propagate = False
+_net_log_queue = queue.SimpleQueue()
+_net_log_handler = logging.handlers.QueueHandler(_net_log_queue)
+_net_log_handler.addFilter(_RateLimitFilter(NET_LOG_RATE))
+net_log.addHandler(_net_log_handler)
+_net_log_stream = logging.StreamHandler(sys.stdout)
+_net_log_stream.setFormatter(logging.Formatter("[NET] %(message)s"))
+_net_log_listener = None
+
+def start_net_log_listener():
+    """Start the network log writer thread (once; not at import, so AI pool workers skip it)"""
+    global _net_log_listener
+    if _net_log_listener is None:
+        _net_log_listener = logging.handlers.QueueListener(_net_log_queue, _net_log_stream)
+        _net_log_listener.start()
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -37,7 +112,28 @@ BOARD_HEIGHT = ROWS * CELL_SIZE
 WINDOW_WIDTH = BOARD_WIDTH + 320
 WINDOW_HEIGHT = BOARD_HEIGHT + 150
 
+# Screen position of every cell, computed once (board drawn at x=20, y=80)
+CELL_CX = [20 + c * CELL_SIZE + CELL_SIZE // 2 for c in range(COLS)]
+CELL_CY = [80 + (ROWS - 1 - r) * CELL_SIZE + CELL_SIZE // 2 for r in range(ROWS)]
+# Top-left of a piece disk, indexed by bitboard bit (the sentinel row is never set)
+PIECE_POS = [(CELL_CX[i // (ROWS + 1)] - CELL_SIZE // 2 + 8, CELL_CY[i % (ROWS + 1)] - CELL_SIZE // 2 + 8)
+             if i % (ROWS + 1) < ROWS else None for i in range(COLS * (ROWS + 1))]
+
 SERVER_URL = 'http://localhost:5000'
+CONNECT_ATTEMPTS = 4       # Initial connect tries before giving up
+CONNECT_BACKOFF_BASE = 0.5  # Seconds; doubled per attempt, +-50% jitter
+CONNECT_BACKOFF_MAX = 4
+BATCH_WINDOW = 0.0  # Seconds; >0 coalesces outgoing emits into one 'batched' frame
+BATCH_MAX = 140     # Flush immediately once this many emits are queued
+CALL_TIMEOUT = 5  # Seconds to wait for the create_game/join_game reply
+MOVE_ACK_TIMEOUT = 2.0  # Seconds to wait for the server's make_move ACK before resending
+MOVE_MAX_TRIES = 3
+COALESCED_GUI_EVENTS = ('on_elo_update', 'set_status')  # Only the newest per frame is applied
+POLL_ITERATIONS = 8  # Event-loop passes per frame when the network runs on the GUI thread
+# Moves go out as the compact 'mv' event, [room_id, col, player_piece, seq]:
+# 25 bytes on the wire instead of 69 for the keyed make_move dict
+MV_COL, MV_SEQ = 1, 3
+LOW_LATENCY = True  # False: re-enable Nagle (TCP_NODELAY=0) so small frames share TCP segments
 
 COLORS = {
     'bg': (26, 26, 46),
@@ -59,129 +155,538 @@ COLORS = {
     'win_highlight': (0, 255, 128),  # Winning pieces glow
 }
 
+# Transparent fill for colorkeyed sprites (never used as a drawing color)
+COLORKEY = (255, 0, 255)
+
+# Frequently used colors as plain names (no dict lookup in per-frame draw code)
+C_BG = COLORS['bg']
+C_PANEL = COLORS['panel']
+C_RED = COLORS['red']
+C_YELLOW = COLORS['yellow']
+C_WHITE = COLORS['white']
+C_GRAY = COLORS['gray']
+C_GREEN = COLORS['green']
+C_CELL_BG = COLORS['cell_bg']
+C_HOVER = COLORS['hover']
+C_WAITING = COLORS['waiting']
+C_WIN_HIGHLIGHT = COLORS['win_highlight']
+
 AI_DEPTHS = {'Kolay': 2, 'Orta': 4, 'Zor': 6}
 
+TEXT_CACHE_SIZE = 512  # Rendered text surfaces kept (oldest evicted first)
+LEADERBOARD_TTL = 30   # Seconds before the leaderboard is re-fetched
+LOBBY_REFRESH = 2      # Seconds between room list fetches while the lobby is open
+AI_MIN_DELAY = 0.3     # Minimum "AI dusunuyor..." time before the AI move is played
+ANIM_DROP_TIME = 0.4   # Seconds for a piece to fall the full board height
+FPS_ACTIVE = 60        # Game screens
+FPS_IDLE = 20          # Menus, lobby, leaderboard
+# Pure-Python minimax holds the GIL and stalls the frame loop, so it runs in worker
+# processes; the Numba kernel releases the GIL (nogil) and stays in the AI thread
+AI_PROCESS = not NUMBA_AVAILABLE
+AI_WORKERS = 2  # Long-lived AI threads (and pool processes): a stale search never delays a new one
+
 # =============================================================================
 # NETWORK MANAGER
 # =============================================================================
 
+class NetState(enum.Enum):
+    IDLE = 0          # No socket; the next create/join (or warm_up) starts a connect
+    CONNECTING = 1    # Initial connect with backoff in progress (cancellable)
+    ONLINE = 2
+    RECONNECTING = 3  # Dropped unexpectedly; python-socketio is reconnecting on its own
+
+class Screen(enum.IntEnum):
+    """GUI state; menu screens first so their values index ConnectFourGUI._menu_draw"""
+    LOGIN = 0
+    AUTH_PENDING = 1
+    MENU = 2
+    AI_SELECT = 3
+    LOBBY = 4
+    WAITING = 5
+    LEADERBOARD = 6
+    PLAYING_AI = 7
+    PLAYING_ONLINE = 8
+    SPECTATING = 9
+
+PLAY_SCREENS = (Screen.PLAYING_AI, Screen.PLAYING_ONLINE)   # Local player can drop pieces
+GAME_SCREENS = frozenset(PLAY_SCREENS + (Screen.SPECTATING,))  # Drawn by draw_game
+
 class NetworkManager:
-    def __init__(self, gui):
+    """Socket.IO client on socketio.AsyncClient.
+
+    threaded=True runs the asyncio loop in a daemon thread. threaded=False
+    leaves it to the owner, which calls poll() once per frame: socket I/O
+    and handlers then run on the GUI thread and no network thread exists.
+    Either way the public methods stay sync and hand work to the loop with
+    call_soon_threadsafe, and handlers never call into the GUI directly:
+    they queue the callback (_post) and the GUI loop applies it with
+    dispatch_gui_events().
+    """
+    __slots__ = ('gui', 'sio', 'state', 'room_id', 'my_piece',
+                 '_loop', '_threaded', '_http', '_closing', '_move_template', '_sendable',
+                 '_out_queue', '_flush_handle', '_pending', '_connect_task',
+                 '_seq', '_inflight', '_calls_pending', '_held_start',
+                 '_gui_events', '_call_replies', '_wake')
+    
+    def __init__(self, gui, threaded=True):
         self.gui = gui
-        self.sio = socketio.Client(reconnection=True, reconnection_attempts=5)
-        self.connected = False
+        self._loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+        self._threaded = threaded
+        if threaded:
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        # socketio is imported and the client built on the first online action (_ensure_client),
+        # so AI-only sessions never load the networking stack
+        self.sio = None
+        self._http = None  # aiohttp session shared by every (re)connection of self.sio
+        self.state = NetState.IDLE
+        self._closing = False
         self.room_id = None
         self.my_piece = None
+        self._move_template = None  # compact 'mv' payload for the current room, see send_move
+        self._sendable = False      # connected and in a room: the single check in send_move
+        # Outgoing emit batch; only touched on the network loop
+        self._out_queue = deque()
+        self._flush_handle = None
+        # Emits issued before the first connect completes; flushed by _on_connect
+        self._pending = []
+        self._connect_task = None
+        # Unacknowledged moves: seq -> [payload, tries, retry TimerHandle]; network loop only
+        self._seq = 0
+        self._inflight = {}
+        # create/join requests awaiting their ACK reply, and a game_start that overtook one
+        self._calls_pending = 0
+        self._held_start = None
+        # GUI callbacks queued by the network thread, run by the GUI loop (dispatch_gui_events)
+        self._gui_events = queue.SimpleQueue()
+        self._wake = False  # Work was handed to the loop since the last poll()
+    
+    def _ensure_client(self):
+        if self.sio is not None:
+            return
+        import aiohttp
+        import socketio
+        # engine.io closes and recreates its own HTTP session on every reset; an external one survives reconnects
+        self._http = aiohttp.ClientSession()
+        # Exponential backoff with jitter so clients don't reconnect in lockstep after a server restart
+        self.sio = socketio.AsyncClient(reconnection=True, reconnection_attempts=0,
+                                        reconnection_delay=1, reconnection_delay_max=30,
+                                        randomization_factor=0.5,
+                                        json=SOCKETIO_JSON,
+                                        http_session=self._http)
         self._setup_events()
     
-    def _setup_events(self):
-        @self.sio.event
-        def connect():
-            self.connected = True
-            log("Network connected")
-        
-        @self.sio.event
-        def disconnect():
-            self.connected = False
-            log("Network disconnected")
-        
-        @self.sio.on('game_created')
-        def on_game_created(data):
-            log(f"Game created: {data.get('room_id')}")
-            self.room_id = data['room_id']
-            self.my_piece = data['player_piece']
-            self.gui.on_game_created(data)
-        
-        @self.sio.on('game_joined')
-        def on_game_joined(data):
-            log(f"Game joined: {data.get('room_id')}, role={data.get('role')}")
-            self.room_id = data['room_id']
-            self.my_piece = data['player_piece']
-            self.gui.on_game_joined(data)
-        
-        @self.sio.on('game_start')
-        def on_game_start(data):
-            log("Game start received!")
-            self.gui.on_game_start(data)
-        
-        @self.sio.on('move_made')
-        def on_move_made(data):
-            log(f"Move received: col={data.get('col')}")
-            self.gui.on_move_made(data)
-        
-        @self.sio.on('game_over')
-        def on_game_over(data):
-            log(f"Game over: winner={data.get('winner')}")
-            self.gui.on_game_over_network(data)
-        
-        @self.sio.on('elo_update')
-        def on_elo_update(data):
-            log(f"ELO update: {data}")
-            self.gui.on_elo_update(data)
+    def warm_up(self):
+        """Open the long-lived connection in the background ahead of the first create/join"""
+        self._schedule(self._ensure_connecting)
+    
+    def _run_sync(self, coro, timeout):
+        """Run coro on the network loop and wait for its result"""
+        if self._threaded:
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+        return self._loop.run_until_complete(asyncio.wait_for(coro, timeout))
+    
+    def _schedule(self, callback, *args):
+        """call_soon_threadsafe that also wakes poll() when no client exists yet"""
+        self._wake = True
+        self._loop.call_soon_threadsafe(callback, *args)
+    
+    def poll(self):
+        """Non-threaded mode: run a few non-blocking loop iterations (select with timeout 0).
         
-        @self.sio.on('opponent_disconnected')
-        def on_opponent_disconnected(data):
-            log("Opponent disconnected")
-            self.gui.on_opponent_disconnected()
+        One incoming packet takes several iterations (socket read, frame
+        parse, task wake-up), so POLL_ITERATIONS of them run per frame.
+        Offline (no client, no connect running, nothing scheduled) it returns at once.
+        """
+        if self.sio is None and self._connect_task is None and not self._wake:
+            return
+        self._wake = False
+        for _ in range(POLL_ITERATIONS):
+            self._loop.call_soon(self._loop.stop)
+            self._loop.run_forever()
+    
+    def _setup_events(self):
+        """Register bound methods once; no per-instance closures"""
+        for event, handler in (
+            ('connect', self._on_connect),
+            ('disconnect', self._on_disconnect),
+            ('game_start', self._on_game_start),
+            ('move_made', self._on_move_made),
+            ('game_over', self._on_game_over),
+            ('elo_update', self._on_elo_update),
+            ('opponent_disconnected', self._on_opponent_disconnected),
+            ('error', self._on_error),
+        ):
+            self.sio.on(event, handler)
+        # create_game/join_game are answered through the Socket.IO ACK (sio.call)
+        self._call_replies = {
+            'create_game': self._on_game_created,
+            'join_game': self._on_game_joined,
+        }
+    
+    async def _on_connect(self):
+        self.state = NetState.ONLINE
+        self._sendable = self._move_template is not None
+        self._closing = False
+        if not LOW_LATENCY:
+            self._set_nodelay(False)
+        net_log.info("Network connected")
+        pending, self._pending = self._pending, []
+        for event, payload in pending:
+            self._send(event, payload)
+        # Moves that were never acknowledged before the drop
+        for seq in sorted(self._inflight):
+            self._transmit_move(seq)
+    
+    async def _on_disconnect(self):
+        self.state = NetState.IDLE if self._closing else NetState.RECONNECTING
+        self._sendable = False
+        net_log.info("Network disconnected")
+        if self.room_id and not self._closing:
+            self._post('set_status', "Baglanti koptu, yeniden baglaniliyor...")
+    
+    async def _on_game_created(self, data):
+        net_log.debug("Game created: %s", data.get('room_id'))
+        self.room_id = data['room_id']
+        self.my_piece = data['player_piece']
+        self._move_template = [self.room_id, 0, self.my_piece, 0]
+        self._sendable = self.connected
+        self._post('on_game_created', data)
+    
+    async def _on_game_joined(self, data):
+        net_log.debug("Game joined: %s, role=%s", data.get('room_id'), data.get('role'))
+        self.room_id = data['room_id']
+        self.my_piece = data['player_piece']
+        self._move_template = [self.room_id, 0, self.my_piece, 0]
+        self._sendable = self.connected
+        self._post('on_game_joined', data)
+    
+    async def _on_game_start(self, data):
+        if self._calls_pending:
+            # The server sends game_start before the join reply; apply the reply first
+            self._held_start = data
+            return
+        net_log.debug("Game start received!")
+        self._post('on_game_start', data)
+    
+    async def _on_move_made(self, data):
+        if isinstance(data, bytes):
+            if msgpack is None:
+                net_log.warning("Binary move_made received but msgpack is not installed")
+                return
+            data = msgpack.unpackb(data, raw=False)
+        if net_log.isEnabledFor(logging.DEBUG):
+            net_log.debug("Move received: col=%s", data.get('col'))
+        self._post('on_move_made', data)
+    
+    async def _on_game_over(self, data):
+        net_log.debug("Game over: winner=%s", data.get('winner'))
+        self._post('on_game_over_network', data)
+    
+    async def _on_elo_update(self, data):
+        net_log.debug("ELO update: %s", data)
+        self._post('on_elo_update', data)
+    
+    async def _on_opponent_disconnected(self, data):
+        net_log.debug("Opponent disconnected")
+        self._post('on_opponent_disconnected')
+    
+    async def _on_error(self, data):
+        net_log.warning("Server error: %s", data)
+        self._post('set_status', f"Hata: {data.get('msg', '')}")
+    
+    def _post(self, name, *args):
+        self._gui_events.put((name, args))
+    
+    def dispatch_gui_events(self):
+        """Run queued GUI callbacks on the calling (GUI) thread; True if any ran.
         
-        @self.sio.on('error')
-        def on_error(data):
-            log(f"Server error: {data}")
-            self.gui.set_status(f"Hata: {data.get('msg', '')}")
+        A burst is handled in one go, and for latest-wins callbacks
+        (COALESCED_GUI_EVENTS) only the newest one in the burst is applied.
+        """
+        items = []
+        try:
+            while True:
+                items.append(self._gui_events.get_nowait())
+        except queue.Empty:
+            pass
+        if not items:
+            return False
+        last = {name: i for i, (name, _) in enumerate(items) if name in COALESCED_GUI_EVENTS}
+        for i, (name, args) in enumerate(items):
+            if last.get(name, i) == i:
+                getattr(self.gui, name)(*args)
+        return True
+    
+    def _set_nodelay(self, enabled):
+        """Toggle TCP_NODELAY on the websocket transport (no-op while long-polling)"""
+        ws = getattr(self.sio.eio, 'ws', None)
+        sock = ws.get_extra_info('socket') if ws is not None else None
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if enabled else 0)
+        except OSError as e:
+            net_log.warning("TCP_NODELAY not changed: %s", e)
+    
+    def _emit(self, event, payload):
+        """Hand an emit to the network loop (thread-safe, never blocks)"""
+        self._schedule(self._send, event, payload)
+    
+    def _send(self, event, payload):
+        if not self.connected:
+            self._pending.append((event, payload))
+            self._ensure_connecting()
+        elif event in self._call_replies:
+            self._loop.create_task(self._call(event, payload))
+        elif BATCH_WINDOW > 0:
+            self._enqueue(event, payload)
+        else:
+            self._loop.create_task(self.sio.emit(event, payload))
     
-    def connect_to_server(self):
-        if self.connected:
-            return True
+    async def _call(self, event, payload):
+        self._calls_pending += 1
         try:
-            self.sio.connect(SERVER_URL, wait_timeout=5)
-            time.sleep(0.5)
-            return self.connected
+            data = await self.sio.call(event, payload, timeout=CALL_TIMEOUT)
         except Exception as e:
-            log(f"Connection failed: {e}")
+            net_log.warning("%s: no reply (%s)", event, e)
+            self._post('set_status', "Sunucu yanit vermedi!")
+            data = None
+        finally:
+            self._calls_pending -= 1
+        # None: the request was refused and the server sent an 'error' event instead
+        if data:
+            await self._call_replies[event](data)
+        if not self._calls_pending and self._held_start is not None:
+            data, self._held_start = self._held_start, None
+            await self._on_game_start(data)
+    
+    def _enqueue(self, event, payload):
+        self._out_queue.append((event, payload))
+        if len(self._out_queue) >= BATCH_MAX:
+            self._flush_batch()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(BATCH_WINDOW, self._flush_batch)
+    
+    def _flush_batch(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        items = list(self._out_queue)
+        self._out_queue.clear()
+        if len(items) == 1:
+            self._loop.create_task(self.sio.emit(*items[0]))
+        elif items:
+            self._loop.create_task(self.sio.emit('batched', items))
+    
+    async def _connect_with_backoff(self):
+        try:
+            for attempt in range(CONNECT_ATTEMPTS):
+                try:
+                    # wait=True returns only after the namespace 'connect' event has fired
+                    await self.sio.connect(SERVER_URL, wait_timeout=5)
+                    return True
+                except Exception as e:
+                    net_log.warning("Connection failed (%d/%d): %s", attempt + 1, CONNECT_ATTEMPTS, e)
+                if attempt + 1 < CONNECT_ATTEMPTS:
+                    delay = min(CONNECT_BACKOFF_BASE * 2 ** attempt, CONNECT_BACKOFF_MAX)
+                    await asyncio.sleep(delay * (1 + random.uniform(-0.5, 0.5)))
             return False
+        except asyncio.CancelledError:
+            # Cancelled by the user: drop a half-open engine.io session, if any
+            await self.sio.disconnect()
+            raise
+    
+    def _ensure_connecting(self):
+        # Only from IDLE: once online, python-socketio's own reconnection takes over
+        if self.state is not NetState.IDLE:
+            return
+        self._ensure_client()
+        self.state = NetState.CONNECTING
+        self._connect_task = self._loop.create_task(self._connect_with_backoff())
+        self._connect_task.add_done_callback(self._on_connect_done)
+    
+    def _on_connect_done(self, task):
+        self._connect_task = None
+        if self.state is NetState.CONNECTING:
+            self.state = NetState.IDLE
+        if task.cancelled():
+            self._pending.clear()
+            self._post('set_status', "Baglanti iptal edildi")
+        elif not task.result() and self._pending:
+            self._pending.clear()
+            self._post('set_status', "Sunucuya baglanilamadi!")
+    
+    @property
+    def connected(self):
+        return self.state is NetState.ONLINE
+    
+    @property
+    def connecting(self):
+        return self.state is NetState.CONNECTING
+    
+    def cancel_connect(self):
+        """Abort an in-progress connect; buffered create/join emits are dropped"""
+        self._schedule(self._cancel_connect)
+    
+    def _cancel_connect(self):
+        if self._connect_task is not None:
+            self._connect_task.cancel()
+    
+    def _track_move(self, payload):
+        self._inflight[payload[MV_SEQ]] = [payload, 0, None]
+        self._transmit_move(payload[MV_SEQ])
+    
+    def _transmit_move(self, seq):
+        """(Re)send an unacknowledged move; bypasses the batcher so the ACK callback fires"""
+        entry = self._inflight.get(seq)
+        if entry is None or not self.connected:
+            return  # acknowledged, or replayed by _on_connect
+        if entry[2] is not None:
+            entry[2].cancel()
+        if entry[1] >= MOVE_MAX_TRIES:
+            del self._inflight[seq]
+            net_log.warning("Move %d not acknowledged, giving up", seq)
+            self._post('set_status', "Hamle gonderilemedi!")
+            return
+        entry[1] += 1
+        self._loop.create_task(self.sio.emit('mv', entry[0],
+                                             callback=lambda ack=None: self._on_move_ack(seq, ack)))
+        entry[2] = self._loop.call_later(MOVE_ACK_TIMEOUT, self._transmit_move, seq)
+    
+    def _on_move_ack(self, seq, ack):
+        entry = self._inflight.pop(seq, None)
+        if entry is not None and entry[2] is not None:
+            entry[2].cancel()
+        if ack and not ack.get('ok', True):
+            net_log.info("Move %d rejected by server", seq)
+    
+    def _clear_inflight(self):
+        for entry in self._inflight.values():
+            if entry[2] is not None:
+                entry[2].cancel()
+        self._inflight.clear()
+    
+    def query(self, event, callback, payload=None):
+        """Read-only request (active_games, leaderboard) over the open socket.
+        
+        The reply (None on failure) is handed to gui.<callback> through _post.
+        Returns False when not connected so the caller can fall back to HTTP.
+        """
+        if not self.connected:
+            return False
+        self._schedule(lambda: self._loop.create_task(self._query(event, callback, payload or {})))
+        return True
+    
+    async def _query(self, event, callback, payload):
+        try:
+            data = await self.sio.call(event, payload, timeout=CALL_TIMEOUT)
+        except Exception as e:
+            net_log.warning("%s: no reply (%s)", event, e)
+            data = None
+        self._post(callback, data)
     
     def create_game(self, user_id):
-        if self.connect_to_server():
-            self.sio.emit('create_game', {'user_id': user_id})
-            return True
-        return False
+        self._emit('create_game', {'user_id': user_id})
     
     def join_game(self, room_id, user_id):
-        if self.connect_to_server():
-            self.sio.emit('join_game', {'room_id': room_id, 'user_id': user_id})
-            return True
-        return False
+        self._emit('join_game', {'room_id': room_id, 'user_id': user_id})
     
     def send_move(self, col):
+        if self._sendable:
+            if net_log.isEnabledFor(logging.DEBUG):
+                net_log.debug("Sending move: col=%s", col)
+            self._seq += 1
+            # Copy, don't mutate: the payload stays in _inflight until it is ACKed
+            payload = self._move_template[:]
+            payload[MV_COL] = col
+            payload[MV_SEQ] = self._seq
+            self._schedule(self._track_move, payload)
+    
+    def reset(self):
+        """Leave the current room but keep the socket connected for the next game"""
         if self.connected and self.room_id:
-            log(f"Sending move: col={col}")
-            self.sio.emit('make_move', {'room_id': self.room_id, 'col': col, 'player_piece': self.my_piece})
+            try:
+                self._emit('leave_game', {'room_id': self.room_id})
+            except Exception as e:
+                net_log.warning("Leave failed: %s", e)
+        self._schedule(self._clear_inflight)
+        self.room_id = None
+        self.my_piece = None
+        self._move_template = None
+        self._sendable = False
     
     def disconnect(self):
-        if self.connected:
+        """Close the socket for good (app exit); also stops a running reconnect"""
+        self._closing = True
+        if self.sio is not None and self.state is not NetState.IDLE:
             try:
-                self.sio.disconnect()
+                self._run_sync(self._close(), timeout=2)
             except:
                 pass
+        self.state = NetState.IDLE
+        self._sendable = False
         self.room_id = None
         self.my_piece = None
+    
+    async def _close(self):
+        await self.sio.disconnect()
+        await self._http.close()
 
 # =============================================================================
 # MAIN GUI CLASS
 # =============================================================================
 
 class ConnectFourGUI:
+    # Fixed attribute set: faster attribute access in the frame loop, typos fail loudly
+    __slots__ = ('screen', 'clock', 'font_large', 'font_medium', 'font_small', 'font_tiny',
+                 '_text_cache', '_btn_cache', '_panel_cache', '_game_bg_cache', '_board_bg',
+                 '_red_disk', '_yellow_disk', '_hover_disk', '_cell_disk', '_win_ring', '_glow_disks',
+                 'state', 'game', 'ai', 'ai_lock', 'ai_session_id', 'ai_thinking',
+                 'username', 'user_id', 'user_elo', 'opponent_name', 'opponent_elo', 'is_guest',
+                 'network', 'http', 'my_piece', 'room_id',
+                 'active_games', 'active_games_loading', 'lobby_session', 'waiting_dots',
+                 'leaderboard_data', 'leaderboard_error', 'leaderboard_fetched_at', 'leaderboard_loading',
+                 'status_text', 'hover_col', 'buttons', '_menu_draw', '_button_actions', '_button_prefixes',
+                 '_dirty', '_hover_dirty', '_wake_event',
+                 'input_fields', 'active_input', 'auth_result', 'is_spectator',
+                 'animating', 'anim_col', 'anim_y', 'anim_target_y', 'anim_start_y', 'anim_t0',
+                 'anim_duration', 'anim_piece', 'anim_callback',
+                 'ai_results', 'ai_started_at', 'ai_jobs', 'ai_pool', 'ai_future',
+                 'analysis_enabled', 'analysis_data', 'analysis_thread', 'analysis_lock',
+                 'analyzers', 'analyzer_lock')
+    
     def __init__(self):
         pygame.init()
         pygame.display.set_caption("Connect Four Pro")
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        # Hover is sampled with mouse.get_pos() each frame (see update_hover); the other
+        # types are never handled and would only wake a pointless full repaint
+        pygame.event.set_blocked([pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL, pygame.KEYUP,
+                                  pygame.JOYAXISMOTION, pygame.JOYBALLMOTION, pygame.JOYHATMOTION,
+                                  pygame.FINGERMOTION])
+        # All cached surfaces below are convert()ed to this display's pixel format
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.DOUBLEBUF)
         self.clock = pygame.time.Clock()
         self.font_large = pygame.font.SysFont('segoeui', 36, bold=True)
         self.font_medium = pygame.font.SysFont('segoeui', 24)
         self.font_small = pygame.font.SysFont('segoeui', 18)
         self.font_tiny = pygame.font.SysFont('segoeui', 14)
         
-        self.state = "LOGIN"
+        # (text, font, color) -> rendered Surface; labels rarely change between frames
+        self._text_cache = {}
+        self._btn_cache = {}  # (w, h, color) -> rounded button background
+        self._panel_cache = {}  # is_spectator -> static info panel chrome
+        self._game_bg_cache = {}  # title -> full static game screen (see draw_game)
+        self._board_bg = self._build_board_bg()
+        
+        # Fixed-size disks, blitted instead of rasterized per frame
+        self._red_disk = self._make_disk(COLORS['red'], CELL_SIZE // 2 - 8)
+        self._yellow_disk = self._make_disk(COLORS['yellow'], CELL_SIZE // 2 - 8)
+        self._hover_disk = self._make_disk(COLORS['hover'], CELL_SIZE // 2 - 10)
+        self._cell_disk = self._make_disk(COLORS['cell_bg'], CELL_SIZE // 2 - 5)
+        self._win_ring = self._make_disk(C_WHITE, CELL_SIZE // 2 - 8, width=3)
+        self._glow_disks = {}  # radius -> pulsing win glow disk (6 sizes)
+        
+        self.state = Screen.LOGIN
         self.game = ConnectFourGame()
         self.ai = None
         self.ai_thinking = False
@@ -198,38 +703,93 @@ class ConnectFourGUI:
         self.opponent_elo = 1200
         self.is_guest = False
         
-        self.network = NetworkManager(self)
+        start_net_log_listener()
+        self.network = NetworkManager(self, threaded=False)
+        # One keep-alive HTTP session for auth, lobby, leaderboard and ELO requests
+        # (small pool: at most a couple of background fetches run at once)
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
         self.my_piece = PLAYER1_PIECE
         self.room_id = None
         
+        # Room list is fetched in a background thread like the leaderboard
         self.active_games = []
-        self.last_lobby_refresh = 0
+        self.active_games_loading = False
+        self.lobby_session = 0  # Bumped on each lobby entry; older pollers see the mismatch and exit
+        self.waiting_dots = -1
+        
+        # Leaderboard is fetched in a background thread, drawn from here
+        self.leaderboard_data = None       # None = not loaded yet
+        self.leaderboard_error = False
+        self.leaderboard_fetched_at = 0
+        self.leaderboard_loading = False
         self.status_text = ""
         self.hover_col = -1
-        self.buttons = []
+        self.buttons = {}  # action id -> Rect, rebuilt in place by each draw_* screen
+        # Menu screen draw methods, indexed by Screen value
+        self._menu_draw = (self.draw_login, self.draw_auth_pending, self.draw_menu, self.draw_ai_select,
+                           self.draw_lobby, self.draw_waiting, self.draw_leaderboard)
+        # Click handlers, built once (see handle_button_click)
+        self._button_actions = {
+            'DO_LOGIN': self.do_login, 'DO_REGISTER': self.do_register, 'GUEST': self.guest_login,
+            'LOGOUT': self.logout, 'BACK': self.reset_to_menu,
+            'REFRESH': lambda: (self.refresh_active_games(), self.set_status("Yenilendi")),
+            'AI': lambda: setattr(self, 'state', Screen.AI_SELECT),
+            'LOBBY': self.open_lobby,
+            'LEADERBOARD': lambda: (setattr(self, 'state', Screen.LEADERBOARD), self.refresh_leaderboard()),
+            'CREATE': self.create_online_game,
+            'QUIT': self.quit
+        }
+        self._button_prefixes = {
+            'AI': lambda depth: self.start_ai_game(int(depth)),
+            'JOIN': self.join_online_game,
+            'SPECTATE': self.spectate_game,
+        }
+        
+        # Redraw only when something visible changed (events, status, network)
+        self._dirty = True
+        self._hover_dirty = False  # Only the hover strip above the board changed
+        self._wake_event = None    # Event that ended the idle wait, handled next frame
         
         self.input_fields = {
             'username': {'value': '', 'active': False, 'rect': None},
             'password': {'value': '', 'active': False, 'rect': None}
         }
         self.active_input = None
+        self.auth_result = None  # Set by the auth thread, consumed in run()
         
         self.animating = False
         self.anim_col = 0
         self.anim_y = 0
         self.anim_target_y = 0
+        self.anim_start_y = 0
+        self.anim_t0 = 0.0
+        self.anim_duration = ANIM_DROP_TIME
         self.anim_piece = PLAYER1_PIECE
         self.anim_callback = None
         
-        # Pending AI move with session check
-        self.pending_ai_move = None
-        self.pending_ai_session = -1
+        # Finished AI moves as (session_id, col); stale sessions are discarded on read
+        self.ai_results = queue.Queue()
+        self.ai_started_at = 0.0  # Search starts at once; the move is shown after AI_MIN_DELAY
+        # (session_id, game snapshot) per AI turn, served by AI_WORKERS persistent threads
+        self.ai_jobs = queue.Queue()
+        for _ in range(AI_WORKERS):
+            threading.Thread(target=self._ai_worker, daemon=True).start()
+        self.ai_pool = None  # Process pool, created on the first AI game when AI_PROCESS
+        self.ai_future = None  # Latest search submitted to ai_pool
         
         # Background Analysis (Lichess-style) - runs silently during online games
         self.analysis_enabled = True  # Enable/disable analysis
         self.analysis_data = []       # List of {move_num, player, col, best_move, eval_score}
         self.analysis_thread = None
         self.analysis_lock = threading.Lock()
+        # One analysis engine per side, reused so each keeps a single transposition
+        # table. Searches are serialized on their own lock: analysis_lock is also
+        # taken by the draw path and must not be held for a whole search.
+        self.analyzers = {}
+        self.analyzer_lock = threading.Lock()
         
         log("GUI initialized")
     
@@ -237,8 +797,22 @@ class ConnectFourGUI:
     # DRAWING
     # =========================================================================
     
+    def render_text(self, text, font, color):
+        """font.render with a FIFO cache of the resulting surfaces"""
+        key = (text, id(font), color)
+        cache = self._text_cache
+        surface = cache.get(key)
+        if surface is None:
+            surface = font.render(text, True, color).convert_alpha()
+            cache[key] = surface
+            if len(cache) > TEXT_CACHE_SIZE:
+                # dicts keep insertion order: drop the oldest entry. No reordering
+                # on hits keeps the per-label cost to a single dict lookup.
+                del cache[next(iter(cache))]
+        return surface
+    
     def draw_text(self, text, font, color, x, y, center=True):
-        surface = font.render(str(text), True, color)
+        surface = self.render_text(str(text), font, color)
         rect = surface.get_rect()
         if center:
             rect.center = (x, y)
@@ -248,7 +822,13 @@ class ConnectFourGUI:
     
     def draw_button(self, text, x, y, w, h, color=None):
         color = color or COLORS['button']
-        pygame.draw.rect(self.screen, color, (x, y, w, h), border_radius=8)
+        key = (w, h, color)
+        bg = self._btn_cache.get(key)
+        if bg is None:
+            bg = self._keyed_surface(w, h)
+            pygame.draw.rect(bg, color, (0, 0, w, h), border_radius=8)
+            self._btn_cache[key] = bg
+        self.screen.blit(bg, (x, y))
         self.draw_text(text, self.font_small, COLORS['white'], x + w//2, y + h//2)
         return pygame.Rect(x, y, w, h)
     
@@ -269,97 +849,136 @@ class ConnectFourGUI:
         
         positions = []
         mask = self.game.winning_mask
-        if mask == 0:
-            return []
-        
+        while mask:
+            bit = mask & -mask
+            positions.append(divmod(bit.bit_length() - 1, ROWS + 1))
+            mask ^= bit
+        return positions
+    
+    def _build_board_bg(self):
+        """Board frame + 42 empty cells, drawn once and blitted every frame"""
+        surface = pygame.Surface((BOARD_WIDTH + 20, BOARD_HEIGHT + 20)).convert()
+        surface.fill(COLORS['bg'])
+        pygame.draw.rect(surface, COLORS['board'], surface.get_rect(), border_radius=10)
         for col in range(COLS):
             for row in range(ROWS):
-                idx = col * (ROWS + 1) + row
-                if (mask >> idx) & 1:
-                    positions.append((col, row))
-        return positions
+                x = 10 + col * CELL_SIZE + CELL_SIZE // 2
+                y = 10 + row * CELL_SIZE + CELL_SIZE // 2
+                pygame.draw.circle(surface, COLORS['cell_bg'], (x, y), CELL_SIZE // 2 - 5)
+        return surface
+    
+    @staticmethod
+    def _keyed_surface(w, h):
+        """Opaque display-format surface with a colorkey instead of per-pixel alpha.
+        Shapes drawn with pygame.draw are hard-edged, so the result is identical and
+        RLE colorkey blits are cheaper than alpha blending."""
+        surface = pygame.Surface((w, h)).convert()
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return surface
+    
+    def _make_disk(self, color, radius, width=0):
+        surface = self._keyed_surface(radius * 2, radius * 2)
+        pygame.draw.circle(surface, color, (radius, radius), radius, width)
+        return surface
     
     def draw_board(self):
-        bx, by = 20, 80
-        pygame.draw.rect(self.screen, COLORS['board'], (bx-10, by-10, BOARD_WIDTH+20, BOARD_HEIGHT+20), border_radius=10)
+        screen, game = self.screen, self.game
+        blit = screen.blit
+        bb = game.bitboards
+        # Board frame and empty cells are part of the cached game background (draw_game)
         
         # Get winning positions for highlight
         winning_positions = self.get_winning_positions()
         
-        for col in range(COLS):
-            for row in range(ROWS):
-                x = bx + col * CELL_SIZE + CELL_SIZE // 2
-                y = by + (ROWS - 1 - row) * CELL_SIZE + CELL_SIZE // 2
-                
-                # Check if this is a winning position
-                is_winning = (col, row) in winning_positions
-                
-                # Cell background (with glow effect for winners)
-                if is_winning:
-                    # Pulsing glow effect
-                    pulse = abs((time.time() * 3) % 2 - 1)  # 0 to 1 oscillation
-                    glow_size = int(CELL_SIZE // 2 + 5 + pulse * 5)
-                    pygame.draw.circle(self.screen, COLORS['win_highlight'], (x, y), glow_size)
-                
-                pygame.draw.circle(self.screen, COLORS['cell_bg'], (x, y), CELL_SIZE // 2 - 5)
-                
-                # Pieces
-                idx = col * (ROWS + 1) + row
-                if (self.game.bitboards[PLAYER1_PIECE] >> idx) & 1:
-                    pygame.draw.circle(self.screen, COLORS['red'], (x, y), CELL_SIZE // 2 - 8)
-                    if is_winning:
-                        pygame.draw.circle(self.screen, COLORS['white'], (x, y), CELL_SIZE // 2 - 8, 3)
-                elif (self.game.bitboards[PLAYER2_PIECE] >> idx) & 1:
-                    pygame.draw.circle(self.screen, COLORS['yellow'], (x, y), CELL_SIZE // 2 - 8)
-                    if is_winning:
-                        pygame.draw.circle(self.screen, COLORS['white'], (x, y), CELL_SIZE // 2 - 8, 3)
+        # Pulsing glow behind winning cells (cell background redrawn on top)
+        if winning_positions:
+            pulse = abs((time.time() * 3) % 2 - 1)  # 0 to 1 oscillation
+            glow_size = int(CELL_SIZE // 2 + 5 + pulse * 5)
+            glow = self._glow_disks.get(glow_size)
+            if glow is None:
+                glow = self._glow_disks[glow_size] = self._make_disk(C_WIN_HIGHLIGHT, glow_size)
+            cell_disk, cell_off = self._cell_disk, CELL_SIZE // 2 - 5
+            for col, row in winning_positions:
+                x, y = CELL_CX[col], CELL_CY[row]
+                blit(glow, (x - glow_size, y - glow_size))
+                blit(cell_disk, (x - cell_off, y - cell_off))
+        
+        # Pieces: walk each player's set bits (lowest first) instead of all 42 cells,
+        # looking each disk position up in PIECE_POS.
+        # Everything is collected and sent in one Surface.blits() call.
+        win_mask = game.winning_mask if winning_positions else 0
+        ring = self._win_ring
+        sprites = []
+        add = sprites.append
+        for disk, mask in ((self._red_disk, bb[PLAYER1_PIECE]), (self._yellow_disk, bb[PLAYER2_PIECE])):
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                pos = PIECE_POS[bit.bit_length() - 1]
+                add((disk, pos))
+                if win_mask & bit:
+                    add((ring, pos))
+        if sprites:
+            screen.blits(sprites, doreturn=False)
         
         # Hover indicator
-        if self.hover_col >= 0 and not self.animating and not self.game.game_over and not self.is_spectator:
-            can_play = (self.state == "PLAYING_AI" and self.game.current_player == PLAYER1_PIECE and not self.ai_thinking) or \
-                       (self.state == "PLAYING_ONLINE" and self.game.current_player == self.my_piece)
+        if self.hover_col >= 0 and not self.animating and not game.game_over and not self.is_spectator:
+            can_play = (self.state is Screen.PLAYING_AI and game.current_player == PLAYER1_PIECE and not self.ai_thinking) or \
+                       (self.state is Screen.PLAYING_ONLINE and game.current_player == self.my_piece)
             if can_play:
-                pygame.draw.circle(self.screen, COLORS['hover'], (bx + self.hover_col * CELL_SIZE + CELL_SIZE//2, 50), CELL_SIZE//2 - 10)
+                blit(self._hover_disk, (CELL_CX[self.hover_col] - CELL_SIZE//2 + 10, 50 - CELL_SIZE//2 + 10))
         
         # Animating piece
         if self.animating:
-            color = COLORS['red'] if self.anim_piece == PLAYER1_PIECE else COLORS['yellow']
-            pygame.draw.circle(self.screen, color, (bx + self.anim_col * CELL_SIZE + CELL_SIZE//2, int(self.anim_y)), CELL_SIZE//2 - 8)
+            disk = self._red_disk if self.anim_piece == PLAYER1_PIECE else self._yellow_disk
+            blit(disk, (CELL_CX[self.anim_col] - CELL_SIZE//2 + 8, int(self.anim_y) - CELL_SIZE//2 + 8))
+    
+    def _build_panel_static(self, is_spectator):
+        surface = pygame.Surface((250, 320)).convert()
+        surface.fill(C_BG)
+        pygame.draw.rect(surface, C_PANEL, (0, 0, 250, 320), border_radius=10)
+        title = "IZLIYORSUNUZ" if is_spectator else "OYUN BILGISI"
+        title_surface = self.render_text(title, self.font_medium, C_WAITING if is_spectator else C_WHITE)
+        surface.blit(title_surface, title_surface.get_rect(center=(125, 25)))
+        pygame.draw.circle(surface, C_RED, (25, 70), 15)
+        pygame.draw.circle(surface, C_YELLOW, (25, 130), 15)
+        return surface
     
     def draw_info_panel(self):
         px, py = BOARD_WIDTH + 50, 80
-        pygame.draw.rect(self.screen, COLORS['panel'], (px, py, 250, 320), border_radius=10)
-        title = "IZLIYORSUNUZ" if self.is_spectator else "OYUN BILGISI"
-        self.draw_text(title, self.font_medium, COLORS['waiting'] if self.is_spectator else COLORS['white'], px+125, py+25)
+        # Panel background, title and both player discs come from one cached surface
+        static = self._panel_cache.get(self.is_spectator)
+        if static is None:
+            static = self._panel_cache[self.is_spectator] = self._build_panel_static(self.is_spectator)
+        self.screen.blit(static, (px, py))
         
-        pygame.draw.circle(self.screen, COLORS['red'], (px+25, py+70), 15)
-        p1_name = self.username if (self.state == "PLAYING_AI" or self.my_piece == PLAYER1_PIECE) else self.opponent_name
-        p1_elo = self.user_elo if (self.state == "PLAYING_AI" or self.my_piece == PLAYER1_PIECE) else self.opponent_elo
-        self.draw_text(p1_name[:10], self.font_small, COLORS['white'], px+50, py+65, center=False)
-        self.draw_text(f"ELO: {p1_elo}", self.font_tiny, COLORS['gray'], px+50, py+85, center=False)
+        p1_name = self.username if (self.state is Screen.PLAYING_AI or self.my_piece == PLAYER1_PIECE) else self.opponent_name
+        p1_elo = self.user_elo if (self.state is Screen.PLAYING_AI or self.my_piece == PLAYER1_PIECE) else self.opponent_elo
+        self.draw_text(p1_name[:10], self.font_small, C_WHITE, px+50, py+65, center=False)
+        self.draw_text(f"ELO: {p1_elo}", self.font_tiny, C_GRAY, px+50, py+85, center=False)
         if self.game.current_player == PLAYER1_PIECE and not self.game.game_over:
-            self.draw_text("< SIRA", self.font_small, COLORS['green'], px+200, py+70)
+            self.draw_text("< SIRA", self.font_small, C_GREEN, px+200, py+70)
         
-        pygame.draw.circle(self.screen, COLORS['yellow'], (px+25, py+130), 15)
-        if self.state == "PLAYING_AI":
+        if self.state is Screen.PLAYING_AI:
             p2_name = f"AI (D{self.ai.depth if self.ai else '?'})"
         else:
             p2_name = self.username if self.my_piece == PLAYER2_PIECE else self.opponent_name
         p2_elo = self.user_elo if self.my_piece == PLAYER2_PIECE else self.opponent_elo
-        self.draw_text(p2_name[:10], self.font_small, COLORS['white'], px+50, py+125, center=False)
-        if self.state != "PLAYING_AI":
-            self.draw_text(f"ELO: {p2_elo}", self.font_tiny, COLORS['gray'], px+50, py+145, center=False)
+        self.draw_text(p2_name[:10], self.font_small, C_WHITE, px+50, py+125, center=False)
+        if self.state is not Screen.PLAYING_AI:
+            self.draw_text(f"ELO: {p2_elo}", self.font_tiny, C_GRAY, px+50, py+145, center=False)
         if self.game.current_player == PLAYER2_PIECE and not self.game.game_over:
-            self.draw_text("< SIRA", self.font_small, COLORS['green'], px+200, py+130)
+            self.draw_text("< SIRA", self.font_small, C_GREEN, px+200, py+130)
         
         if self.room_id:
-            self.draw_text(f"Oda: {self.room_id}", self.font_medium, COLORS['hover'], px+125, py+200)
-        self.draw_text(f"Hamle: {len(self.game.move_history)}", self.font_small, COLORS['gray'], px+125, py+240)
+            self.draw_text(f"Oda: {self.room_id}", self.font_medium, C_HOVER, px+125, py+200)
+        self.draw_text(f"Hamle: {len(self.game.move_history)}", self.font_small, C_GRAY, px+125, py+240)
         
         # Debug info
         if DEBUG:
-            self.draw_text(f"State: {self.state}", self.font_tiny, COLORS['gray'], px+125, py+280)
-            self.draw_text(f"AI: {'ON' if self.ai else 'OFF'}", self.font_tiny, COLORS['gray'], px+125, py+295)
+            self.draw_text(f"State: {self.state.name}", self.font_tiny, C_GRAY, px+125, py+280)
+            self.draw_text(f"AI: {'ON' if self.ai else 'OFF'}", self.font_tiny, C_GRAY, px+125, py+295)
         
         return self.draw_button("Menu", px+50, py+270 if not DEBUG else py+310, 150, 40)
     
@@ -374,57 +993,58 @@ class ConnectFourGUI:
         cx, fw, fh = WINDOW_WIDTH//2, 280, 45
         self.draw_input_field("Kullanici Adi", 'username', cx-fw//2, 170, fw, fh)
         self.draw_input_field("Sifre", 'password', cx-fw//2, 260, fw, fh, is_password=True)
-        self.buttons = []
-        self.buttons.append(('DO_LOGIN', self.draw_button("Giris Yap", cx-140, 340, 130, 45)))
-        self.buttons.append(('DO_REGISTER', self.draw_button("Kayit Ol", cx+10, 340, 130, 45, COLORS['green'])))
+        self.buttons.clear()
+        self.buttons['DO_LOGIN'] = self.draw_button("Giris Yap", cx-140, 340, 130, 45)
+        self.buttons['DO_REGISTER'] = self.draw_button("Kayit Ol", cx+10, 340, 130, 45, COLORS['green'])
         pygame.draw.line(self.screen, COLORS['gray'], (cx-100, 420), (cx+100, 420), 1)
         self.draw_text("veya", self.font_tiny, COLORS['gray'], cx, 420)
-        self.buttons.append(('GUEST', self.draw_button("Misafir Olarak Devam", cx-120, 450, 240, 45, COLORS['panel'])))
+        self.buttons['GUEST'] = self.draw_button("Misafir Olarak Devam", cx-120, 450, 240, 45, COLORS['panel'])
         if self.status_text:
             color = COLORS['green'] if 'basarili' in self.status_text.lower() else COLORS['red']
             self.draw_text(self.status_text, self.font_small, color, WINDOW_WIDTH//2, WINDOW_HEIGHT-40)
     
-    def draw_menu(self):
+    def draw_auth_pending(self):
         self.screen.fill(COLORS['bg'])
-        self.draw_text("CONNECT FOUR PRO", self.font_large, COLORS['red'], WINDOW_WIDTH//2, 50)
+        self.draw_text("CONNECT FOUR PRO", self.font_large, COLORS['red'], WINDOW_WIDTH//2, 60)
+        self.draw_text(self.status_text, self.font_medium, COLORS['white'], WINDOW_WIDTH//2, WINDOW_HEIGHT//2)
+        self.buttons.clear()
+    
+    def draw_menu(self):
+        self.screen.fill(C_BG)
+        self.draw_text("CONNECT FOUR PRO", self.font_large, C_RED, WINDOW_WIDTH//2, 50)
         if self.is_guest:
-            self.draw_text(f"Misafir: {self.username}", self.font_small, COLORS['gray'], WINDOW_WIDTH//2, 95)
+            self.draw_text(f"Misafir: {self.username}", self.font_small, C_GRAY, WINDOW_WIDTH//2, 95)
         else:
-            self.draw_text(self.username, self.font_medium, COLORS['white'], WINDOW_WIDTH//2, 90)
-            self.draw_text(f"ELO: {self.user_elo}", self.font_small, COLORS['green'], WINDOW_WIDTH//2, 115)
+            self.draw_text(self.username, self.font_medium, C_WHITE, WINDOW_WIDTH//2, 90)
+            self.draw_text(f"ELO: {self.user_elo}", self.font_small, C_GREEN, WINDOW_WIDTH//2, 115)
         bw, bh, cx = 250, 50, WINDOW_WIDTH//2 - 125
-        self.buttons = [
-            ('AI', self.draw_button("Yapay Zekaya Karsi", cx, 160, bw, bh)),
-            ('LOBBY', self.draw_button("Online Lobi", cx, 225, bw, bh)),
-            ('LEADERBOARD', self.draw_button("Liderlik Tablosu", cx, 290, bw, bh)),
-            ('LOGOUT', self.draw_button("Cikis Yap", cx, 355, bw, bh, COLORS['panel'])),
-            ('QUIT', self.draw_button("Oyunu Kapat", cx, 420, bw, bh, COLORS['gray']))
-        ]
+        self.buttons.clear()
+        self.buttons['AI'] = self.draw_button("Yapay Zekaya Karsi", cx, 160, bw, bh)
+        self.buttons['LOBBY'] = self.draw_button("Online Lobi", cx, 225, bw, bh)
+        self.buttons['LEADERBOARD'] = self.draw_button("Liderlik Tablosu", cx, 290, bw, bh)
+        self.buttons['LOGOUT'] = self.draw_button("Cikis Yap", cx, 355, bw, bh, C_PANEL)
+        self.buttons['QUIT'] = self.draw_button("Oyunu Kapat", cx, 420, bw, bh, C_GRAY)
         if self.status_text:
-            self.draw_text(self.status_text, self.font_small, COLORS['gray'], WINDOW_WIDTH//2, WINDOW_HEIGHT-30)
+            self.draw_text(self.status_text, self.font_small, C_GRAY, WINDOW_WIDTH//2, WINDOW_HEIGHT-30)
     
     def draw_ai_select(self):
         self.screen.fill(COLORS['bg'])
         self.draw_text("ZORLUK SEVIYESI SEC", self.font_large, COLORS['red'], WINDOW_WIDTH//2, 80)
         bw, bh, cx = 200, 50, WINDOW_WIDTH//2 - 100
-        self.buttons = []
+        self.buttons.clear()
         y = 180
         for name, depth in AI_DEPTHS.items():
-            self.buttons.append((f'AI_{depth}', self.draw_button(f"{name} (D{depth})", cx, y, bw, bh)))
+            self.buttons[f'AI_{depth}'] = self.draw_button(f"{name} (D{depth})", cx, y, bw, bh)
             y += 70
-        self.buttons.append(('BACK', self.draw_button("Geri", cx, y+30, bw, bh)))
+        self.buttons['BACK'] = self.draw_button("Geri", cx, y+30, bw, bh)
     
     def draw_lobby(self):
         self.screen.fill(COLORS['bg'])
         self.draw_text("ONLINE LOBI", self.font_large, COLORS['red'], WINDOW_WIDTH//2, 40)
-        if time.time() - self.last_lobby_refresh > 2:
-            self.refresh_active_games()
-            self.last_lobby_refresh = time.time()
-        self.buttons = [
-            ('CREATE', self.draw_button("+ Yeni Oyun", 50, 80, 160, 45)),
-            ('REFRESH', self.draw_button("Yenile", 230, 80, 100, 45)),
-            ('BACK', self.draw_button("Geri", WINDOW_WIDTH-150, 80, 100, 45))
-        ]
+        self.buttons.clear()
+        self.buttons['CREATE'] = self.draw_button("+ Yeni Oyun", 50, 80, 160, 45)
+        self.buttons['REFRESH'] = self.draw_button("Yenile", 230, 80, 100, 45)
+        self.buttons['BACK'] = self.draw_button("Geri", WINDOW_WIDTH-150, 80, 100, 45)
         pygame.draw.rect(self.screen, COLORS['panel'], (30, 140, WINDOW_WIDTH-60, 35), border_radius=5)
         for txt, xpos in [("ODA",80),("OYUNCU 1",200),("OYUNCU 2",380),("DURUM",530),("ISLEM",680)]:
             self.draw_text(txt, self.font_small, COLORS['white'], xpos, 157)
@@ -436,19 +1056,16 @@ class ConnectFourGUI:
                 pygame.draw.rect(self.screen, COLORS['panel'] if i%2==0 else COLORS['bg'], (30, y, WINDOW_WIDTH-60, 45))
                 rid = g.get('room_id','?')
                 self.draw_text(rid, self.font_small, COLORS['hover'], 80, y+22)
-                self.draw_text(f"{g.get('p1','?')[:8]} ({g.get('p1_elo',0)})", self.font_small, COLORS['red'], 200, y+22)
-                p2 = g.get('p2', 'Bekleniyor...')
-                if p2 == 'Bekleniyor...':
-                    self.draw_text(p2, self.font_small, COLORS['waiting'], 380, y+22)
-                else:
-                    self.draw_text(f"{p2[:8]} ({g.get('p2_elo',0)})", self.font_small, COLORS['yellow'], 380, y+22)
+                self.draw_text(g['p1_label'], self.font_small, COLORS['red'], 200, y+22)
+                p2_color = COLORS['waiting'] if g['p2_label'] == 'Bekleniyor...' else COLORS['yellow']
+                self.draw_text(g['p2_label'], self.font_small, p2_color, 380, y+22)
                 status = g.get('status', 'WAITING')
                 if status == 'WAITING':
                     self.draw_text("Bekliyor", self.font_small, COLORS['waiting'], 530, y+22)
-                    self.buttons.append((f'JOIN_{rid}', self.draw_button("Katil", 640, y+5, 80, 35, COLORS['green'])))
+                    self.buttons[f'JOIN_{rid}'] = self.draw_button("Katil", 640, y+5, 80, 35, COLORS['green'])
                 else:
                     self.draw_text("Oyunda", self.font_small, COLORS['playing'], 530, y+22)
-                    self.buttons.append((f'SPECTATE_{rid}', self.draw_button("Izle", 640, y+5, 80, 35, COLORS['hover'])))
+                    self.buttons[f'SPECTATE_{rid}'] = self.draw_button("Izle", 640, y+5, 80, 35, COLORS['hover'])
                 y += 50
         if self.status_text:
             self.draw_text(self.status_text, self.font_small, COLORS['gray'], WINDOW_WIDTH//2, WINDOW_HEIGHT-30)
@@ -459,32 +1076,50 @@ class ConnectFourGUI:
         if self.room_id:
             self.draw_text(f"Oda Kodu: {self.room_id}", self.font_large, COLORS['green'], WINDOW_WIDTH//2, 250)
             self.draw_text("Rakip lobiden katilabilir!", self.font_medium, COLORS['white'], WINDOW_WIDTH//2, 310)
-        self.draw_text(f"Bekleniyor{'.'*(int(time.time()*2)%4)}", self.font_medium, COLORS['gray'], WINDOW_WIDTH//2, 380)
-        self.buttons = [('BACK', self.draw_button("Iptal", WINDOW_WIDTH//2-75, 450, 150, 45))]
+        self.waiting_dots = int(time.time() * 2) % 4
+        self.draw_text(f"Bekleniyor{'.' * self.waiting_dots}", self.font_medium, COLORS['gray'], WINDOW_WIDTH//2, 380)
+        self.buttons.clear()
+        self.buttons['BACK'] = self.draw_button("Iptal", WINDOW_WIDTH//2-75, 450, 150, 45)
     
     def draw_leaderboard(self):
         self.screen.fill(COLORS['bg'])
         self.draw_text("LIDERLIK TABLOSU", self.font_large, COLORS['red'], WINDOW_WIDTH//2, 50)
-        try:
-            r = requests.get(f"{SERVER_URL}/leaderboard", timeout=3)
-            if r.status_code == 200:
-                y = 120
-                for i, p in enumerate(r.json()[:10]):
-                    prefix = ["1.","2.","3."][i] if i < 3 else f"{i+1}."
-                    self.draw_text(f"{prefix} {p['username']} - ELO: {p['rating']} (W:{p['wins']} L:{p['losses']})", 
-                                  self.font_small, COLORS['yellow'] if i<3 else COLORS['white'], WINDOW_WIDTH//2, y)
-                    y += 35
-        except:
+        if time.time() - self.leaderboard_fetched_at > LEADERBOARD_TTL:
+            self.refresh_leaderboard()
+        if self.leaderboard_error:
             self.draw_text("Sunucuya baglanilamadi", self.font_medium, COLORS['gray'], WINDOW_WIDTH//2, 200)
-        self.buttons = [('BACK', self.draw_button("Geri", WINDOW_WIDTH//2-75, WINDOW_HEIGHT-80, 150, 45))]
+        elif self.leaderboard_data is None:
+            self.draw_text("Yukleniyor...", self.font_medium, COLORS['gray'], WINDOW_WIDTH//2, 200)
+        else:
+            y = 120
+            for i, p in enumerate(self.leaderboard_data[:10]):
+                prefix = ["1.","2.","3."][i] if i < 3 else f"{i+1}."
+                self.draw_text(f"{prefix} {p['username']} - ELO: {p['rating']} (W:{p['wins']} L:{p['losses']})", 
+                              self.font_small, COLORS['yellow'] if i<3 else COLORS['white'], WINDOW_WIDTH//2, y)
+                y += 35
+        self.buttons.clear()
+        self.buttons['BACK'] = self.draw_button("Geri", WINDOW_WIDTH//2-75, WINDOW_HEIGHT-80, 150, 45)
+    
+    def _build_game_bg(self, title):
+        """Static part of the game screen: background, title, board and status bar"""
+        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        surface.fill(C_BG)
+        title_surface = self.render_text(title, self.font_large, C_RED)
+        surface.blit(title_surface, title_surface.get_rect(center=(WINDOW_WIDTH//2, 30)))
+        surface.blit(self._board_bg, (10, 70))
+        pygame.draw.rect(surface, C_PANEL, (0, WINDOW_HEIGHT-50, WINDOW_WIDTH, 50))
+        return surface
     
     def draw_game(self):
-        self.screen.fill(COLORS['bg'])
-        title = "CANLI YAYIN" if self.is_spectator else ("AI'ya Karsi" if self.state=="PLAYING_AI" else "Online Mac")
-        self.draw_text(title, self.font_large, COLORS['red'], WINDOW_WIDTH//2, 30)
+        title = "CANLI YAYIN" if self.is_spectator else ("AI'ya Karsi" if self.state is Screen.PLAYING_AI else "Online Mac")
+        # One full-screen blit replaces fill + title + board frame/cells + status bar
+        bg = self._game_bg_cache.get(title)
+        if bg is None:
+            bg = self._game_bg_cache[title] = self._build_game_bg(title)
+        self.screen.blit(bg, (0, 0))
         self.draw_board()
-        self.buttons = [('BACK', self.draw_info_panel())]
-        pygame.draw.rect(self.screen, COLORS['panel'], (0, WINDOW_HEIGHT-50, WINDOW_WIDTH, 50))
+        self.buttons.clear()
+        self.buttons['BACK'] = self.draw_info_panel()
         self.draw_text(self.status_text, self.font_small, COLORS['white'], WINDOW_WIDTH//2, WINDOW_HEIGHT-25)
     
     # =========================================================================
@@ -492,18 +1127,83 @@ class ConnectFourGUI:
     # =========================================================================
     
     def refresh_active_games(self):
+        """Fetch the room list without blocking: over the game socket when it is open, else HTTP in a thread"""
+        if self.active_games_loading:
+            return
+        self.active_games_loading = True
+        if not self.network.query('active_games', 'on_active_games'):
+            threading.Thread(target=self._fetch_active_games, daemon=True).start()
+    
+    def _fetch_active_games(self):
+        games = None
         try:
-            r = requests.get(f"{SERVER_URL}/active_games", timeout=2)
+            r = self.http.get(f"{SERVER_URL}/active_games", timeout=2)
             if r.status_code == 200:
-                self.active_games = r.json()
+                games = r.json()
         except:
             pass
+        self.on_active_games(games)
+    
+    def on_active_games(self, games):
+        """Room list reply from either path (None: request failed, keep the current list)"""
+        if games is not None:
+            # Row labels are formatted once per fetch instead of on every lobby frame
+            for g in games:
+                g['p1_label'] = f"{g.get('p1','?')[:8]} ({g.get('p1_elo',0)})"
+                p2 = g.get('p2', 'Bekleniyor...')
+                g['p2_label'] = p2 if p2 == 'Bekleniyor...' else f"{p2[:8]} ({g.get('p2_elo',0)})"
+            self.active_games = games
+        self.active_games_loading = False
+        self._dirty = True
+    
+    def open_lobby(self):
+        self.state = Screen.LOBBY
+        self.refresh_active_games()
+        self.network.warm_up()
+        self.lobby_session += 1
+        threading.Thread(target=self._poll_lobby, args=(self.lobby_session,), daemon=True).start()
+    
+    def _poll_lobby(self, sid):
+        """Re-fetch the room list on a timer while the lobby is open (the frame loop never polls)"""
+        while True:
+            time.sleep(LOBBY_REFRESH)
+            if self.state is not Screen.LOBBY or sid != self.lobby_session:
+                return
+            self.refresh_active_games()
+    
+    def refresh_leaderboard(self):
+        """Fetch the leaderboard without blocking (game socket when open, else HTTP in a thread)"""
+        if self.leaderboard_loading:
+            return
+        self.leaderboard_loading = True
+        self.leaderboard_fetched_at = time.time()
+        if not self.network.query('leaderboard', 'on_leaderboard'):
+            threading.Thread(target=self._fetch_leaderboard, daemon=True).start()
+    
+    def _fetch_leaderboard(self):
+        try:
+            r = self.http.get(f"{SERVER_URL}/leaderboard", timeout=3)
+            data = r.json() if r.status_code == 200 else []
+        except:
+            data = None
+        self.on_leaderboard(data)
+    
+    def on_leaderboard(self, data):
+        """Leaderboard reply from either path (None: server unreachable)"""
+        if data is None:
+            self.leaderboard_error = True
+        else:
+            self.leaderboard_data = data
+            self.leaderboard_error = False
+        self.leaderboard_fetched_at = time.time()
+        self.leaderboard_loading = False
+        self._dirty = True
     
     def refresh_user_elo(self):
         if not self.username or self.is_guest:
             return
         try:
-            r = requests.get(f"{SERVER_URL}/user/{self.username}", timeout=2)
+            r = self.http.get(f"{SERVER_URL}/user/{self.username}", timeout=2)
             if r.status_code == 200:
                 new_elo = r.json().get('user', {}).get('rating', self.user_elo)
                 if new_elo != self.user_elo:
@@ -521,20 +1221,7 @@ class ConnectFourGUI:
         if not u or not p:
             self.set_status("Kullanici adi ve sifre gerekli!")
             return
-        try:
-            r = requests.post(f"{SERVER_URL}/login", json={'username': u, 'password': p}, timeout=5)
-            if r.status_code == 200:
-                user = r.json()['user']
-                self.username, self.user_id, self.user_elo = user['username'], user['user_id'], user.get('rating', 1200)
-                self.is_guest = False
-                self.state = "MENU"
-                self.set_status(f"Hosgeldin {self.username}!")
-                self.clear_inputs()
-                log(f"Logged in as {self.username}, ELO={self.user_elo}")
-            else:
-                self.set_status("Yanlis kullanici adi veya sifre!")
-        except:
-            self.set_status("Sunucuya baglanilamadi!")
+        self.start_auth('login', u, p)
     
     def do_register(self):
         u, p = self.input_fields['username']['value'].strip(), self.input_fields['password']['value']
@@ -544,25 +1231,51 @@ class ConnectFourGUI:
         if len(u) < 3 or len(p) < 3:
             self.set_status("En az 3 karakter gerekli!")
             return
+        self.start_auth('signup', u, p)
+    
+    def start_auth(self, endpoint, u, p):
+        """Run the login/signup POST in a background thread; run() applies the result"""
+        self.state = Screen.AUTH_PENDING
+        self.set_status("Baglaniliyor...")
+        threading.Thread(target=self._auth_worker, args=(endpoint, u, p), daemon=True).start()
+    
+    def _auth_worker(self, endpoint, u, p):
         try:
-            r = requests.post(f"{SERVER_URL}/signup", json={'username': u, 'password': p}, timeout=5)
-            if r.status_code == 201:
-                self.username, self.user_id, self.user_elo, self.is_guest = u, r.json().get('user_id'), 1200, False
-                self.state = "MENU"
-                self.set_status(f"Kayit basarili! Hosgeldin {u}!")
-                self.clear_inputs()
-                log(f"Registered as {self.username}")
+            r = self.http.post(f"{SERVER_URL}/{endpoint}", json={'username': u, 'password': p}, timeout=5)
+            if endpoint == 'login':
+                if r.status_code == 200:
+                    user = r.json()['user']
+                    result = (user['username'], user['user_id'], user.get('rating', 1200), f"Hosgeldin {user['username']}!")
+                else:
+                    result = "Yanlis kullanici adi veya sifre!"
+            elif r.status_code == 201:
+                result = (u, r.json().get('user_id'), 1200, f"Kayit basarili! Hosgeldin {u}!")
             elif r.status_code == 409:
-                self.set_status("Bu kullanici adi zaten alinmis!")
+                result = "Bu kullanici adi zaten alinmis!"
             else:
-                self.set_status("Kayit basarisiz!")
+                result = "Kayit basarisiz!"
         except:
-            self.set_status("Sunucuya baglanilamadi!")
+            result = "Sunucuya baglanilamadi!"
+        self.auth_result = result
+        self._dirty = True
+    
+    def apply_auth_result(self, result):
+        """(username, user_id, elo, message) on success, an error message otherwise"""
+        if isinstance(result, str):
+            self.state = Screen.LOGIN
+            self.set_status(result)
+            return
+        self.username, self.user_id, self.user_elo, message = result
+        self.is_guest = False
+        self.state = Screen.MENU
+        self.set_status(message)
+        self.clear_inputs()
+        log(f"Logged in as {self.username}, ELO={self.user_elo}")
     
     def guest_login(self):
         self.username = f"Misafir_{int(time.time())%10000}"
         self.user_id, self.user_elo, self.is_guest = None, 1200, True
-        self.state = "MENU"
+        self.state = Screen.MENU
         self.set_status("")
         self.clear_inputs()
         log(f"Guest login: {self.username}")
@@ -570,7 +1283,7 @@ class ConnectFourGUI:
     def logout(self):
         log("Logout")
         self.username, self.user_id, self.user_elo, self.is_guest = "", None, 1200, False
-        self.state = "LOGIN"
+        self.state = Screen.LOGIN
         self.set_status("")
         self.clear_inputs()
     
@@ -587,11 +1300,25 @@ class ConnectFourGUI:
         """Thread-safe AI invalidation"""
         with self.ai_lock:
             self.ai_session_id += 1
-            self.pending_ai_move = None
-            self.pending_ai_session = -1
             self.ai_thinking = False
+            if self.ai is not None:
+                self.ai.stop()
+            future, self.ai_future = self.ai_future, None
             self.ai = None
             log(f"AI invalidated, new session: {self.ai_session_id}")
+        # A search still queued in the pool is dropped; one already running in a
+        # worker process cannot be interrupted and its result is discarded.
+        # Outside the lock: cancel() runs the done callback, which takes ai_lock.
+        if future is not None:
+            future.cancel()
+    
+    def quit(self):
+        self.invalidate_ai_session()
+        if self.ai_pool is not None:
+            self.ai_pool.shutdown(wait=False)
+        self.network.disconnect()
+        pygame.quit()
+        sys.exit()
     
     def start_ai_game(self, depth):
         log(f"Starting AI game, depth={depth}")
@@ -599,8 +1326,13 @@ class ConnectFourGUI:
         self.game = ConnectFourGame()
         with self.ai_lock:
             self.ai = AIEngine(PLAYER2_PIECE, depth=depth)
+        if NUMBA_AVAILABLE:
+            # Load the compiled search now so the first AI move does not pay for it
+            threading.Thread(target=warm_up, daemon=True).start()
+        if AI_PROCESS and self.ai_pool is None:
+            self.ai_pool = concurrent.futures.ProcessPoolExecutor(max_workers=AI_WORKERS)
         self.my_piece = PLAYER1_PIECE
-        self.state = "PLAYING_AI"
+        self.state = Screen.PLAYING_AI
         self.is_spectator = False
         self.analysis_data = []  # Clear analysis
         self.status_text = "Senin siran!"
@@ -616,15 +1348,18 @@ class ConnectFourGUI:
         
         def analyze():
             try:
-                # Create a temporary AI for analysis (depth 6 for good analysis)
-                analyzer = AIEngine(player_piece, depth=6)
                 game_copy = game_state.clone()
-                
-                # Find best move for this position
-                best_col = analyzer.find_best_move(game_copy)
-                
-                # Calculate evaluation score
-                eval_score = analyzer.score_position(game_copy, player_piece)
+                with self.analyzer_lock:
+                    # Shared analysis engine for this side (depth 6 for good analysis)
+                    analyzer = self.analyzers.get(player_piece)
+                    if analyzer is None:
+                        analyzer = self.analyzers[player_piece] = AIEngine(player_piece, depth=6)
+                    
+                    # Find best move for this position
+                    best_col = analyzer.find_best_move(game_copy)
+                    
+                    # Calculate evaluation score
+                    eval_score = analyzer.score_position(game_copy, player_piece)
                 
                 # Store analysis result
                 with self.analysis_lock:
@@ -672,24 +1407,26 @@ class ConnectFourGUI:
     def create_online_game(self):
         log("Creating online game")
         self.invalidate_ai_session()
-        if not self.network.create_game(self.username):
-            self.set_status("Sunucuya baglanilamadi!")
+        if not self.network.connected:
+            self.set_status("Sunucuya baglaniliyor... (ESC: iptal)")
+        self.network.create_game(self.username)
     
     def join_online_game(self, room_id):
         log(f"Joining game: {room_id}")
         self.invalidate_ai_session()
         self.room_id = room_id.upper()
         self.is_spectator = False
-        if not self.network.join_game(self.room_id, self.username):
-            self.set_status("Odaya katilamadi!")
+        if not self.network.connected:
+            self.set_status("Sunucuya baglaniliyor... (ESC: iptal)")
+        self.network.join_game(self.room_id, self.username)
     
     def spectate_game(self, room_id):
         log(f"Spectating game: {room_id}")
         self.invalidate_ai_session()
         self.room_id = room_id.upper()
         self.is_spectator = True
-        if self.network.join_game(self.room_id, self.username):
-            self.state = "SPECTATING"
+        self.network.join_game(self.room_id, self.username)
+        self.state = Screen.SPECTATING
     
     # =========================================================================
     # NETWORK EVENTS
@@ -697,13 +1434,14 @@ class ConnectFourGUI:
     
     def on_game_created(self, data):
         self.room_id, self.my_piece = data['room_id'], data['player_piece']
-        self.state, self.is_spectator = "WAITING", False
+        self.state, self.is_spectator = Screen.WAITING, False
         self.set_status(f"Oda: {self.room_id}")
     
     def on_game_joined(self, data):
+        self._dirty = True
         self.room_id, self.my_piece = data['room_id'], data.get('player_piece', 0)
         if data.get('role') == 'spectator':
-            self.is_spectator, self.state = True, "SPECTATING"
+            self.is_spectator, self.state = True, Screen.SPECTATING
             if 'current_state' in data:
                 self.game.from_dict(data['current_state'])
         else:
@@ -717,7 +1455,7 @@ class ConnectFourGUI:
         self.invalidate_ai_session()
         
         self.game = ConnectFourGame()
-        self.state = "PLAYING_ONLINE"
+        self.state = Screen.PLAYING_ONLINE
         self.is_spectator = False
         self.analysis_data = []  # Clear previous analysis
         
@@ -725,7 +1463,7 @@ class ConnectFourGUI:
         self.opponent_name = data.get('opponent_name', oi.get('username', 'Rakip'))
         self.opponent_elo = oi.get('rating', 1200)
         
-        log(f"State={self.state}, AI={self.ai}, opponent={self.opponent_name}")
+        log(f"State={self.state.name}, AI={self.ai}, opponent={self.opponent_name}")
         self.set_status("Oyun basladi!" + (" Senin siran." if self.game.current_player == self.my_piece else " Rakibin sirasi."))
     
     def on_move_made(self, data):
@@ -782,7 +1520,7 @@ class ConnectFourGUI:
         col = data.get('col')
         
         # Start background analysis BEFORE applying move
-        if self.state == "PLAYING_ONLINE" and col is not None:
+        if self.state is Screen.PLAYING_ONLINE and col is not None:
             game_before_move = self.game.clone()
             self.start_background_analysis(game_before_move, move_num, current_player, col)
         
@@ -802,7 +1540,6 @@ class ConnectFourGUI:
             self.set_status("Kirmizi kazandi!" if w==1 else ("Sari kazandi!" if w==2 else "Berabere!"))
         else:
             self.set_status("Kazandin!" if w==self.my_piece else ("Berabere!" if w is None else "Kaybettin."))
-        self.refresh_user_elo()
     
     def on_elo_update(self, data):
         self.user_elo = data.get('new_elo', self.user_elo)
@@ -822,7 +1559,7 @@ class ConnectFourGUI:
             return
         
         # STRICT STATE CHECKS
-        if self.state == "PLAYING_AI":
+        if self.state is Screen.PLAYING_AI:
             if self.game.current_player != PLAYER1_PIECE:
                 return
             if self.ai_thinking:
@@ -830,7 +1567,7 @@ class ConnectFourGUI:
             with self.ai_lock:
                 if self.ai is None:
                     return
-        elif self.state == "PLAYING_ONLINE":
+        elif self.state is Screen.PLAYING_ONLINE:
             if self.game.current_player != self.my_piece:
                 return
         else:
@@ -839,32 +1576,38 @@ class ConnectFourGUI:
         if not self.game.is_valid_location(col):
             return
         
-        log(f"Player click: col={col}, state={self.state}")
+        log(f"Player click: col={col}, state={self.state.name}")
         row = self.game.heights[col] - col * (ROWS + 1)
         self.animate_drop(col, row, self.game.current_player, lambda: self.finish_move(col))
     
     def animate_drop(self, col, row, piece, callback):
         self.animating, self.anim_col, self.anim_piece = True, col, piece
-        self.anim_y, self.anim_target_y = 50, 80 + (ROWS-1-row) * CELL_SIZE + CELL_SIZE//2
+        self.anim_y, self.anim_target_y = 50, CELL_CY[row]
+        self.anim_start_y = self.anim_y
+        # Constant "gravity": fall time grows with the square root of the distance
+        self.anim_duration = ANIM_DROP_TIME * ((self.anim_target_y - self.anim_start_y) / BOARD_HEIGHT) ** 0.5
+        self.anim_t0 = time.monotonic()
         self.anim_callback = callback
     
     def update_animation(self):
+        """Time-based (frame-rate independent) drop with ease-in"""
         if not self.animating:
             return
-        self.anim_y += 18
-        if self.anim_y >= self.anim_target_y:
+        t = min(1.0, (time.monotonic() - self.anim_t0) / self.anim_duration)
+        self.anim_y = self.anim_start_y + (self.anim_target_y - self.anim_start_y) * t * t
+        if t >= 1.0:
             self.anim_y, self.animating = self.anim_target_y, False
             if self.anim_callback:
                 self.anim_callback()
     
     def finish_move(self, col):
-        log(f"finish_move: col={col}, state={self.state}")
+        log(f"finish_move: col={col}, state={self.state.name}")
         
         if not self.game.make_move(col):
             return
         
         # ONLINE MODE - ALWAYS SEND MOVE FIRST (even if game over!)
-        if self.state == "PLAYING_ONLINE":
+        if self.state is Screen.PLAYING_ONLINE:
             log("Online mode - sending move to server")
             self.network.send_move(col)
             
@@ -876,23 +1619,29 @@ class ConnectFourGUI:
             return
         
         # AI MODE
-        if self.state == "PLAYING_AI":
+        if self.state is Screen.PLAYING_AI:
             if self.game.game_over:
                 self.handle_game_over()
                 return
             
             with self.ai_lock:
                 if self.ai is not None and self.game.current_player == PLAYER2_PIECE:
-                    log("AI mode - starting AI thread")
+                    log("AI mode - queueing AI search")
                     self.set_status("AI dusunuyor...")
                     self.ai_thinking = True
+                    self.ai_started_at = time.monotonic()
                     sid = self.ai_session_id
-                    threading.Thread(target=self.ai_move, args=(sid,), daemon=True).start()
+                    # The worker searches a private copy; the live game is only touched here
+                    self.ai_jobs.put((sid, self.game.clone()))
     
-    def ai_move(self, sid):
-        """AI calculation thread with extensive safety checks"""
+    def _ai_worker(self):
+        """Persistent AI thread: runs queued turns for the whole session"""
+        while True:
+            self.ai_move(*self.ai_jobs.get())
+    
+    def ai_move(self, sid, game):
+        """AI calculation (worker thread) with extensive safety checks"""
         log(f"AI thread started, session={sid}")
-        time.sleep(0.3)
         
         # PRE-CHECK
         with self.ai_lock:
@@ -902,18 +1651,49 @@ class ConnectFourGUI:
             if sid != self.ai_session_id:
                 log(f"AI thread aborted: session mismatch ({sid} vs {self.ai_session_id})")
                 return
-            if self.state != "PLAYING_AI":
-                log(f"AI thread aborted: wrong state ({self.state})")
+            if self.state is not Screen.PLAYING_AI:
+                log(f"AI thread aborted: wrong state ({self.state.name})")
                 return
             ai_ref = self.ai  # Get reference while locked
         
         # CALCULATE (outside lock)
+        if self.ai_pool is not None:
+            # Worker process: the result arrives through a callback, so this thread
+            # is free for the next job instead of blocking until the search ends
+            try:
+                future = self.ai_pool.submit(search_best_move, game.to_dict(),
+                                             ai_ref.player_id, ai_ref.depth, sid)
+            except RuntimeError as e:  # Pool already shut down
+                log(f"AI error: {e}")
+                self.deliver_ai_move(sid, None)
+                return
+            with self.ai_lock:
+                current = sid == self.ai_session_id
+                if current:
+                    self.ai_future = future
+            if not current:
+                future.cancel()
+            future.add_done_callback(lambda f: self._on_ai_future(sid, f))
+            return
         try:
-            col = ai_ref.find_best_move(self.game)
+            col = ai_ref.find_best_move(game)
         except Exception as e:
             log(f"AI error: {e}")
             col = None
-        
+        self.deliver_ai_move(sid, col)
+    
+    def _on_ai_future(self, sid, future):
+        """Done callback of a pool search (runs on the executor's management thread)"""
+        col = None
+        if not future.cancelled():
+            try:
+                col = future.result()
+            except Exception as e:
+                log(f"AI error: {e}")
+        self.deliver_ai_move(sid, col)
+    
+    def deliver_ai_move(self, sid, col):
+        """Queue a finished search's move for the main loop if its session is still current"""
         # POST-CHECK
         with self.ai_lock:
             if self.ai is None:
@@ -924,16 +1704,16 @@ class ConnectFourGUI:
                 log(f"AI thread post-check: session mismatch")
                 self.ai_thinking = False
                 return
-            if self.state != "PLAYING_AI":
-                log(f"AI thread post-check: wrong state ({self.state})")
+            if self.state is not Screen.PLAYING_AI:
+                log(f"AI thread post-check: wrong state ({self.state.name})")
                 self.ai_thinking = False
                 return
             
             self.ai_thinking = False
+            self.ai_future = None
             if col is not None and not self.game.game_over:
                 log(f"AI move ready: col={col}")
-                self.pending_ai_move = col
-                self.pending_ai_session = sid
+                self.ai_results.put((sid, col))
     
     def execute_ai_move(self, col):
         log(f"execute_ai_move: col={col}")
@@ -941,8 +1721,8 @@ class ConnectFourGUI:
             if self.ai is None:
                 log("execute_ai_move aborted: ai is None")
                 return
-            if self.state != "PLAYING_AI":
-                log(f"execute_ai_move aborted: wrong state ({self.state})")
+            if self.state is not Screen.PLAYING_AI:
+                log(f"execute_ai_move aborted: wrong state ({self.state.name})")
                 return
         if self.game.game_over or not self.game.is_valid_location(col):
             return
@@ -955,8 +1735,8 @@ class ConnectFourGUI:
             if self.ai is None:
                 log("finish_ai_move aborted: ai is None")
                 return
-            if self.state != "PLAYING_AI":
-                log(f"finish_ai_move aborted: wrong state ({self.state})")
+            if self.state is not Screen.PLAYING_AI:
+                log(f"finish_ai_move aborted: wrong state ({self.state.name})")
                 return
         if not self.game.make_move(col):
             return
@@ -970,7 +1750,7 @@ class ConnectFourGUI:
         log(f"Game over: winner={w}")
         
         # Show analysis summary for online games
-        if self.state == "PLAYING_ONLINE" and self.analysis_data:
+        if self.state is Screen.PLAYING_ONLINE and self.analysis_data:
             summary = self.get_analysis_summary()
             if summary:
                 log(f"Analysis Summary: {summary['total_moves']} moves, {summary['accuracy']:.1f}% accuracy")
@@ -980,45 +1760,57 @@ class ConnectFourGUI:
                     log(f"  Mistakes: {len(summary['mistakes'])}")
         
         if w == PLAYER1_PIECE:
-            self.set_status("Kazandin!" if self.state=="PLAYING_AI" or self.my_piece==1 else f"{self.opponent_name} kazandi!")
+            self.set_status("Kazandin!" if self.state is Screen.PLAYING_AI or self.my_piece==1 else f"{self.opponent_name} kazandi!")
         elif w == PLAYER2_PIECE:
-            self.set_status("AI kazandi!" if self.state=="PLAYING_AI" else ("Kazandin!" if self.my_piece==2 else f"{self.opponent_name} kazandi!"))
+            self.set_status("AI kazandi!" if self.state is Screen.PLAYING_AI else ("Kazandin!" if self.my_piece==2 else f"{self.opponent_name} kazandi!"))
         else:
             self.set_status("Berabere!")
     
     def set_status(self, text):
         self.status_text = text
+        self._dirty = True
     
     def reset_to_menu(self):
         log("Reset to menu")
         self.invalidate_ai_session()
-        self.network.disconnect()
-        self.network = NetworkManager(self)
+        self.network.reset()
         self.room_id, self.is_spectator = None, False
         self.game = ConnectFourGame()
-        self.state = "MENU"
+        self.state = Screen.MENU
         self.refresh_user_elo()
     
     # =========================================================================
     # EVENTS
     # =========================================================================
     
+    def update_hover(self):
+        """Sample the mouse once per frame instead of handling every MOUSEMOTION event"""
+        hover_col = -1
+        if self.state in PLAY_SCREENS:
+            mx, my = pygame.mouse.get_pos()
+            if 20 <= mx < 20+BOARD_WIDTH and 80 <= my < 80+BOARD_HEIGHT:
+                hover_col = (mx - 20) // CELL_SIZE
+        if hover_col != self.hover_col:
+            self.hover_col = hover_col
+            self._hover_dirty = True
+    
     def handle_events(self):
-        for e in pygame.event.get():
+        # One pump per frame; both drains below then just read the queue
+        pygame.event.pump()
+        events = pygame.event.get([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN], pump=False)
+        if self._wake_event is not None:
+            # Already taken off the queue by the idle wait in run(); it came first
+            e, self._wake_event = self._wake_event, None
+            self._dirty = True
+            if e.type in (pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                events.insert(0, e)
+        for e in events:
+            self._dirty = True
             if e.type == pygame.QUIT:
-                self.invalidate_ai_session()
-                self.network.disconnect()
-                pygame.quit()
-                sys.exit()
-            elif e.type == pygame.MOUSEMOTION:
-                mx, my = e.pos
-                if self.state in ["PLAYING_AI", "PLAYING_ONLINE"] and 20 <= mx <= 20+BOARD_WIDTH and 80 <= my <= 80+BOARD_HEIGHT:
-                    self.hover_col = (mx - 20) // CELL_SIZE
-                else:
-                    self.hover_col = -1
+                self.quit()
             elif e.type == pygame.MOUSEBUTTONDOWN:
                 mx, my = e.pos
-                if self.state == "LOGIN":
+                if self.state is Screen.LOGIN:
                     for fn, f in self.input_fields.items():
                         if f['rect'] and f['rect'].collidepoint(mx, my):
                             for ff in self.input_fields.values():
@@ -1026,13 +1818,14 @@ class ConnectFourGUI:
                             f['active'] = True
                             self.active_input = fn
                             return
-                for bid, rect in self.buttons:
-                    if rect.collidepoint(mx, my):
-                        self.handle_button_click(bid)
-                        return
-                if self.state in ["PLAYING_AI", "PLAYING_ONLINE"] and 20 <= mx <= 20+BOARD_WIDTH and 80 <= my <= 80+BOARD_HEIGHT:
+                # First button under the cursor, found in C by Rect.collidedict (dict order kept)
+                hit = pygame.Rect(mx, my, 1, 1).collidedict(self.buttons, True)
+                if hit:
+                    self.handle_button_click(hit[0])
+                    return
+                if self.state in PLAY_SCREENS and 20 <= mx <= 20+BOARD_WIDTH and 80 <= my <= 80+BOARD_HEIGHT:
                     self.handle_click((mx - 20) // CELL_SIZE)
-            elif e.type == pygame.KEYDOWN and self.state == "LOGIN" and self.active_input:
+            elif e.type == pygame.KEYDOWN and self.state is Screen.LOGIN and self.active_input:
                 f = self.input_fields[self.active_input]
                 if e.key == pygame.K_RETURN:
                     if self.active_input == 'username':
@@ -1049,64 +1842,118 @@ class ConnectFourGUI:
                     f['value'] = f['value'][:-1]
                 elif e.unicode.isprintable() and len(f['value']) < 20:
                     f['value'] += e.unicode
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE and self.network.connecting:
+                self.network.cancel_connect()
+        
+        # Anything else (window expose/focus, ...) just needs a repaint
+        if pygame.event.get(pump=False):
+            self._dirty = True
     
     def handle_button_click(self, bid):
-        actions = {
-            'DO_LOGIN': self.do_login, 'DO_REGISTER': self.do_register, 'GUEST': self.guest_login,
-            'LOGOUT': self.logout, 'BACK': self.reset_to_menu, 
-            'REFRESH': lambda: (self.refresh_active_games(), self.set_status("Yenilendi")),
-            'AI': lambda: setattr(self, 'state', 'AI_SELECT'),
-            'LOBBY': lambda: (setattr(self, 'state', 'LOBBY'), self.refresh_active_games()),
-            'LEADERBOARD': lambda: setattr(self, 'state', 'LEADERBOARD'),
-            'CREATE': self.create_online_game,
-            'QUIT': lambda: (self.invalidate_ai_session(), self.network.disconnect(), pygame.quit(), sys.exit())
-        }
-        if bid in actions:
-            actions[bid]()
-        elif bid.startswith('AI_'):
-            self.start_ai_game(int(bid.split('_')[1]))
-        elif bid.startswith('JOIN_'):
-            self.join_online_game(bid.replace('JOIN_', ''))
-        elif bid.startswith('SPECTATE_'):
-            self.spectate_game(bid.replace('SPECTATE_', ''))
+        action = self._button_actions.get(bid)
+        if action is not None:
+            action()
+            return
+        # Parameterised ids: AI_<depth>, JOIN_<room>, SPECTATE_<room>
+        prefix, _, arg = bid.partition('_')
+        action = self._button_prefixes.get(prefix)
+        if action is not None:
+            action(arg)
     
     # =========================================================================
     # MAIN LOOP
     # =========================================================================
     
+    def needs_redraw(self):
+        if self._dirty or self.animating or self._hover_dirty:
+            return True
+        # Waiting screen only changes when its "..." advances (twice a second)
+        if self.state is Screen.WAITING and int(time.time() * 2) % 4 != self.waiting_dots:
+            return True
+        if self.state is Screen.LEADERBOARD and time.time() - self.leaderboard_fetched_at > LEADERBOARD_TTL:
+            return True
+        # Pulsing win highlight
+        return self.state in GAME_SCREENS and self.game.winning_mask != 0
+    
+    def get_dirty_rects(self):
+        """Screen areas that change on a game frame without a state change"""
+        rects = []
+        if self._hover_dirty:
+            rects.append(pygame.Rect(20, 0, BOARD_WIDTH, 80))
+        if self.animating:
+            rects.append(pygame.Rect(20 + self.anim_col * CELL_SIZE, 0, CELL_SIZE, 80 + BOARD_HEIGHT))
+        if self.game.winning_mask:
+            rects.append(pygame.Rect(10, 70, BOARD_WIDTH + 20, BOARD_HEIGHT + 20))
+        return rects
+    
     def run(self):
         log("Main loop starting")
         while True:
             self.handle_events()
+            self.update_hover()
             self.update_animation()
             
+            if self.auth_result is not None:
+                result, self.auth_result = self.auth_result, None
+                self.apply_auth_result(result)
+            
             # AI move with STRICT VALIDATION
-            if self.pending_ai_move is not None:
-                with self.ai_lock:
-                    valid = (self.ai is not None and 
-                            self.state == "PLAYING_AI" and 
-                            self.pending_ai_session == self.ai_session_id)
-                
-                if valid:
-                    col = self.pending_ai_move
-                    self.pending_ai_move = None
-                    self.pending_ai_session = -1
-                    self.execute_ai_move(col)
-                else:
-                    log(f"Discarding stale AI move (state={self.state}, ai={self.ai is not None})")
-                    self.pending_ai_move = None
-                    self.pending_ai_session = -1
+            if time.monotonic() - self.ai_started_at >= AI_MIN_DELAY:
+                try:
+                    sid, col = self.ai_results.get_nowait()
+                except queue.Empty:
+                    sid = None
+                if sid is not None:
+                    with self.ai_lock:
+                        valid = (self.ai is not None and 
+                                self.state is Screen.PLAYING_AI and 
+                                sid == self.ai_session_id)
+                    
+                    if valid:
+                        self.execute_ai_move(col)
+                    else:
+                        log(f"Discarding stale AI move (state={self.state.name}, ai={self.ai is not None})")
             
-            # Draw
-            screens = {'LOGIN': self.draw_login, 'MENU': self.draw_menu, 'AI_SELECT': self.draw_ai_select,
-                      'LOBBY': self.draw_lobby, 'WAITING': self.draw_waiting, 'LEADERBOARD': self.draw_leaderboard}
-            if self.state in screens:
-                screens[self.state]()
-            elif self.state in ["PLAYING_AI", "PLAYING_ONLINE", "SPECTATING"]:
-                self.draw_game()
+            # Socket I/O and network callbacks, on this thread so they never race the drawing code
+            self.network.poll()
+            if self.network.dispatch_gui_events():
+                self._dirty = True
             
-            pygame.display.flip()
-            self.clock.tick(60)
+            # Draw (skipped entirely when the frame would be identical)
+            if self.needs_redraw():
+                full_frame = self._dirty
+                self._dirty = False  # cleared first so changes made while drawing aren't lost
+                if self.state not in GAME_SCREENS:
+                    self._menu_draw[self.state]()
+                    pygame.display.flip()
+                else:
+                    if full_frame:
+                        self.draw_game()
+                        pygame.display.flip()
+                    else:
+                        # Partial frame: clip drawing to the changed regions so the
+                        # full-screen background blit only touches those pixels
+                        rects = self.get_dirty_rects()
+                        if rects:
+                            self.screen.set_clip(rects[0].unionall(rects[1:]))
+                            self.draw_game()
+                            self.screen.set_clip(None)
+                            pygame.display.update(rects)
+                self._hover_dirty = False
+            
+            # Precise pacing only while a piece is falling; menus idle at a lower rate
+            if self.animating:
+                self.clock.tick_busy_loop(FPS_ACTIVE)
+            elif self.state in GAME_SCREENS:
+                self.clock.tick(FPS_ACTIVE)
+            else:
+                # Idle screens: block in SDL until input arrives or the idle tick
+                # elapses, so a click is handled at once instead of after the sleep
+                event = pygame.event.wait(1000 // FPS_IDLE)
+                if event.type != pygame.NOEVENT:
+                    self._wake_event = event
 
 if __name__ == "__main__":
+    # Frozen exe: AI pool workers re-launch this executable and must stop here
+    multiprocessing.freeze_support()
     ConnectFourGUI().run()
\ No newline at end of file
@@ -24,7 +24,34 @@ from game_core import ConnectFourGame, PLAYER1_PIECE, PLAYER2_PIECE
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'production_secret_key_c4_2024')
 
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# orjson (opsiyonel): Socket.IO paketlerini çok daha hızlı serialize eder
+try:
+    import orjson
+
+    class _OrjsonCodec:
+        """json-module shim so python-socketio can use orjson."""
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+    SOCKETIO_JSON = _OrjsonCodec
+except ImportError:
+    SOCKETIO_JSON = None
+
+# msgpack (opsiyonel): move_made tahta durumunu binary frame olarak gönderir.
+# İstemcilerin hepsi çözebilmeli, bu yüzden BINARY_BOARD=1 ile açılır.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+BINARY_BOARD = msgpack is not None and os.environ.get('BINARY_BOARD') == '1'
+
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', json=SOCKETIO_JSON)
 
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
@@ -80,6 +107,24 @@ def get_user_waiting_game(user_id):
             return room_id
     return None
 
+def list_active_games():
+    """Lobi listesi (HTTP /active_games ve socket 'active_games' ortak)"""
+    games_list = []
+    for room_id, g_data in GAMES.items():
+        p1_info = get_user_info(g_data['p1_uid'])
+        p2_info = get_user_info(g_data['p2_uid']) if g_data['p2_uid'] else None
+        
+        games_list.append({
+            'room_id': room_id,
+            'p1': p1_info.get('username', 'Player1'),
+            'p1_elo': p1_info.get('rating', 1200),
+            'p2': p2_info.get('username', 'Bekleniyor...') if p2_info else 'Bekleniyor...',
+            'p2_elo': p2_info.get('rating', 1200) if p2_info else 0,
+            'status': 'PLAYING' if g_data['p2_uid'] else 'WAITING',
+            'move_count': len(g_data['game'].move_history)
+        })
+    return games_list
+
 def cleanup_old_games():
     """Eski ve tamamlanmış oyunları temizle"""
     now = time.time()
@@ -194,21 +239,7 @@ def leaderboard():
 
 @app.route('/active_games', methods=['GET'])
 def active_games():
-    games_list = []
-    for room_id, g_data in GAMES.items():
-        p1_info = get_user_info(g_data['p1_uid'])
-        p2_info = get_user_info(g_data['p2_uid']) if g_data['p2_uid'] else None
-        
-        games_list.append({
-            'room_id': room_id,
-            'p1': p1_info.get('username', 'Player1'),
-            'p1_elo': p1_info.get('rating', 1200),
-            'p2': p2_info.get('username', 'Bekleniyor...') if p2_info else 'Bekleniyor...',
-            'p2_elo': p2_info.get('rating', 1200) if p2_info else 0,
-            'status': 'PLAYING' if g_data['p2_uid'] else 'WAITING',
-            'move_count': len(g_data['game'].move_history)
-        })
-    return jsonify(games_list), 200
+    return jsonify(list_active_games()), 200
 
 @app.route('/cleanup', methods=['POST'])
 def manual_cleanup():
@@ -284,7 +315,8 @@ def on_create_game(data):
         'p2_sid': None,
         'p2_uid': None,
         'created_at': time.time(),
-        'last_move_at': time.time()
+        'last_move_at': time.time(),
+        'last_seq': {}  # player_piece -> son uygulanan hamle seq'i
     }
     
     join_room(room_id)
@@ -292,11 +324,14 @@ def on_create_game(data):
     user_info = get_user_info(user_id)
     print(f"[ROOM] {room_id} Created by {user_info.get('username', user_id)}")
     
-    emit('game_created', {
+    # Yanıt hem event olarak gider hem de ACK olarak döner (istemci sio.call kullanır)
+    reply = {
         'room_id': room_id,
         'player_piece': PLAYER1_PIECE,
         'your_info': user_info
-    })
+    }
+    emit('game_created', reply)
+    return reply
 
 @socketio.on('join_game')
 def on_join_game(data):
@@ -328,12 +363,13 @@ def on_join_game(data):
         
         print(f"[ROOM] {room_id}: {user_info.get('username', user_id)} joined as P2")
         
-        emit('game_joined', {
+        reply = {
             'room_id': room_id,
             'player_piece': PLAYER2_PIECE,
             'role': 'player',
             'opponent_info': p1_info
-        })
+        }
+        emit('game_joined', reply)
         
         # P1'e oyunun başladığını bildir
         emit('game_start', {
@@ -357,45 +393,76 @@ def on_join_game(data):
         # Spectator olarak katıl
         print(f"[ROOM] {room_id}: Spectator ({user_info.get('username', user_id)}) joined")
         
-        emit('game_joined', {
+        reply = {
             'room_id': room_id,
             'player_piece': 0,
             'role': 'spectator',
             'current_state': game.to_dict(),
             'p1_info': get_user_info(g_data['p1_uid']),
             'p2_info': get_user_info(g_data['p2_uid'])
-        })
+        }
+        emit('game_joined', reply)
+    
+    return reply
 
 @socketio.on('make_move')
 def on_make_move(data):
     room_id = data.get('room_id')
     col = data.get('col')
     player_piece = data.get('player_piece')
+    seq = data.get('seq')
+    if not isinstance(seq, int):
+        seq = None  # Bozuk seq: tekrar kontrolü olmadan işle, karşılaştırmada TypeError olmasın
     
+    # Dönüş değeri istemciye ACK olarak gider
     if room_id not in GAMES:
-        return
+        return {'seq': seq, 'ok': False}
         
     g_data = GAMES[room_id]
     game = g_data['game']
     
+    # Yeniden gönderilen (zaten uygulanmış) hamle: tekrar oynama, sadece onayla
+    last_seq = g_data['last_seq']
+    if seq is not None and seq <= last_seq.get(player_piece, 0):
+        return {'seq': seq, 'ok': True}
+    
     if g_data['p2_uid'] is None:
         emit('error', {'msg': 'Rakip bekleniyor!'}, to=request.sid)
-        return
+        return {'seq': seq, 'ok': False}
     
     if game.current_player != player_piece:
         emit('error', {'msg': 'Sıra sizde değil!'}, to=request.sid)
-        return
+        return {'seq': seq, 'ok': False}
     
-    if game.make_move(col):
-        g_data['last_move_at'] = time.time()
-        
-        response = game.to_dict()
-        response['col'] = col
-        
+    if not game.make_move(col):
+        return {'seq': seq, 'ok': False}
+    
+    if seq is not None:
+        last_seq[player_piece] = seq
+    g_data['last_move_at'] = time.time()
+    
+    response = game.to_dict()
+    response['col'] = col
+    
+    if BINARY_BOARD:
+        emit('move_made', msgpack.packb(response, use_bin_type=True), to=room_id)
+    else:
         emit('move_made', response, to=room_id)
-        
-        if game.game_over:
-            handle_game_over(room_id, g_data, game)
+    
+    if game.game_over:
+        handle_game_over(room_id, g_data, game)
+    return {'seq': seq, 'ok': True}
+
+@socketio.on('mv')
+def on_move_compact(data):
+    """Kompakt hamle paketi [room_id, col, player_piece, seq]; make_move ile aynı işlenir"""
+    if not (isinstance(data, list) and len(data) == 4 and isinstance(data[0], str)
+            and all(isinstance(v, int) for v in data[1:])):
+        # Bozuk paket: make_move'un hata ACK'i ile dön
+        seq = data[3] if isinstance(data, list) and len(data) == 4 and isinstance(data[3], int) else None
+        return {'seq': seq, 'ok': False}
+    room_id, col, player_piece, seq = data
+    return on_make_move({'room_id': room_id, 'col': col, 'player_piece': player_piece, 'seq': seq})
 
 def handle_game_over(room_id, g_data, game):
     print(f"[GAME OVER] Room: {room_id}, Winner: {game.winner}")
@@ -453,13 +520,58 @@ def handle_game_over(room_id, g_data, game):
         'move_count': len(game.move_history)
     }, to=room_id)
 
+@socketio.on('active_games')
+def on_active_games(data=None):
+    """Lobi listesi açık socket üzerinden (ACK ile döner, ayrı HTTP bağlantısı gerekmez)"""
+    return list_active_games()
+
+@socketio.on('leaderboard')
+def on_leaderboard(data=None):
+    """Liderlik tablosu açık socket üzerinden (ACK ile döner)"""
+    limit = data.get('limit', 10) if isinstance(data, dict) else 10
+    if not isinstance(limit, int) or not 1 <= limit <= db.TOP_PLAYERS_MAX:
+        # Geçersiz limit: veri yok (istemci yanıtı başarısız sayar)
+        return None
+    return db.get_top_players(limit=limit)
+
 @socketio.on('leave_game')
 def on_leave_game(data):
     """Oyundan ayrıl"""
     room_id = data.get('room_id')
     if room_id in GAMES:
+        g_data = GAMES[room_id]
         leave_room(room_id)
         emit('player_left', {'sid': request.sid}, to=room_id)
+        
+        # İstemciler artık bağlantıyı açık tutuyor: ayrılmayı disconnect gibi ele al
+        if g_data['p1_sid'] == request.sid and g_data['p2_uid'] is None:
+            print(f"[ROOM] {room_id} deleted (creator left while waiting)")
+            del GAMES[room_id]
+        elif request.sid in (g_data['p1_sid'], g_data['p2_sid']) and not g_data['game'].game_over:
+            emit('opponent_disconnected', {'msg': 'Rakip ayrıldı'}, to=room_id)
+
+@socketio.on('batched')
+def on_batched(items):
+    """İstemcinin birleştirdiği [event, payload] çiftlerini sırayla ilgili handler'a ilet"""
+    if not isinstance(items, list):
+        return
+    for item in items:
+        if not (isinstance(item, (list, tuple)) and len(item) == 2):
+            continue
+        event, payload = item
+        handler = BATCHED_HANDLERS.get(event)
+        if handler is None:
+            print(f"[BATCH] Unknown event ignored: {event}")
+            continue
+        handler(payload)
+
+BATCHED_HANDLERS = {
+    'create_game': on_create_game,
+    'join_game': on_join_game,
+    'make_move': on_make_move,
+    'mv': on_move_compact,
+    'leave_game': on_leave_game,
+}
 
 # =============================================================================
 # SUNUCU BAŞLATMA